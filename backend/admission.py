@@ -0,0 +1,159 @@
+# Motord admission control
+#
+# Token-bucket rate limits for the guess and lobby-mutation endpoints, enforced as a plain
+# ASGI middleware. It only looks at the method and path (and the client address), so floods
+# are answered with 429 before any form parsing, lobby lookup or broadcast happens.
+#
+# Each bucket is two floats. A bucket that has been idle long enough to refill completely
+# is indistinguishable from a missing one, so sweeps simply drop it.
+
+import ipaddress
+import os
+import re
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from starlette.responses import JSONResponse
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+class AdmissionRule:
+    """Limits for one endpoint: a bucket per player (or client address) and a bucket per lobby"""
+
+    def __init__(self, name: str, pattern: str, player_rate: float, player_burst: float, lobby_rate: float, lobby_burst: float):
+        self.name = name
+        self.pattern = re.compile(pattern)
+        self.player_rate = player_rate
+        self.player_burst = player_burst
+        self.lobby_rate = lobby_rate
+        self.lobby_burst = lobby_burst
+
+# Rates are tokens per second, bursts are bucket capacities
+ADMISSION_RULES: List[AdmissionRule] = [
+    AdmissionRule("translate", r"^/lobby/(?P<lobby>[^/]+)/player/(?P<player>[^/]+)/translate$", 5.0, 10, 30.0, 60),
+    AdmissionRule("ready", r"^/lobby/(?P<lobby>[^/]+)/player/(?P<player>[^/]+)/ready$", 2.0, 4, 10.0, 20),
+    AdmissionRule("difficulty", r"^/lobby/(?P<lobby>[^/]+)/difficulty$", 2.0, 5, 5.0, 10),
+    # Every client reports its own fuse running out, so a lobby sees a burst per word
+    AdmissionRule("timeout", r"^/lobby/(?P<lobby>[^/]+)/timeout$", 1.0, 3, 5.0, 20),
+]
+ADMISSION_SWEEP_INTERVAL = 30.0  # Seconds between sweeps of refilled buckets
+
+class AdmissionController:
+    """Token buckets keyed by (rule, scope, id)"""
+
+    def __init__(self, rules: List[AdmissionRule], clock: Callable[[], float] = time.monotonic):
+        self.rules = rules
+        self.clock = clock  # Monotonic seconds; replaceable so soak runs can compress time
+        self.buckets: Dict[Tuple[str, str, str], TokenBucket] = {}
+        self.last_sweep = clock()
+        self.rejected = 0
+
+    def _take(self, key: Tuple[str, str, str], rate: float, burst: float, now: float) -> float:
+        """Take one token; returns 0 when admitted, else seconds until a token is available"""
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            self.buckets[key] = TokenBucket(burst - 1, now)
+            return 0.0
+        bucket.tokens = min(burst, bucket.tokens + (now - bucket.updated) * rate)
+        bucket.updated = now
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            return 0.0
+        return (1 - bucket.tokens) / rate
+
+    def _sweep(self, now: float):
+        refill_times = {}
+        for rule in self.rules:
+            refill_times[(rule.name, "player")] = rule.player_burst / rule.player_rate
+            refill_times[(rule.name, "lobby")] = rule.lobby_burst / rule.lobby_rate
+        for key, bucket in list(self.buckets.items()):
+            if now - bucket.updated >= refill_times[key[:2]]:
+                del self.buckets[key]
+        self.last_sweep = now
+
+    def check(self, path: str, client: str) -> Optional[float]:
+        """Returns None if the request is admitted, else a Retry-After in seconds"""
+        now = self.clock()
+        if now - self.last_sweep > ADMISSION_SWEEP_INTERVAL:
+            self._sweep(now)
+        for rule in self.rules:
+            match = rule.pattern.match(path)
+            if not match:
+                continue
+            groups = match.groupdict()
+            lobby_id = groups["lobby"]
+            # Endpoints without a player id in the path are limited per client address within the lobby
+            player_key = groups.get("player") or f"{lobby_id}:{client}"
+            wait = self._take((rule.name, "player", player_key), rule.player_rate, rule.player_burst, now)
+            if not wait:
+                wait = self._take((rule.name, "lobby", lobby_id), rule.lobby_rate, rule.lobby_burst, now)
+            if wait:
+                self.rejected += 1
+                return wait
+            return None
+        return None
+
+admission_controller = AdmissionController(ADMISSION_RULES)
+
+class AdmissionControlMiddleware:
+    """Rejects over-limit POSTs with 429 before the request reaches FastAPI"""
+
+    def __init__(self, app, controller: AdmissionController = admission_controller):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "POST":
+            retry_after = self.controller.check(scope["path"], client_address(scope))
+            if retry_after is not None:
+                response = JSONResponse(
+                    {"detail": "Too many requests"},
+                    status_code=429,
+                    headers={"Retry-After": str(max(1, round(retry_after)))}
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+# Peers whose X-Forwarded-For is believed: the nginx/load balancer hops in front of the backend.
+# Defaults to loopback and private ranges, which is where those sit in the docker deployment.
+TRUSTED_PROXIES = [
+    ipaddress.ip_network(network.strip(), strict=False)
+    for network in os.environ.get("MOTORD_TRUSTED_PROXIES", "127.0.0.0/8,::1/128,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16,fc00::/7").split(",")
+    if network.strip()
+]
+
+def is_trusted_proxy(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in TRUSTED_PROXIES)
+
+def client_address(scope) -> str:
+    """Client IP as seen by the outermost trusted proxy.
+
+    X-Forwarded-For is only read when the request comes from a trusted proxy, and is walked
+    from the right: every proxy appends the address it received the request from, so the
+    first untrusted entry is the client, and anything left of it may be forged by the client.
+    """
+    client = scope.get("client")
+    address = client[0] if client else "unknown"
+    if not is_trusted_proxy(address):
+        return address
+    forwarded = []
+    for name, value in scope.get("headers", []):
+        if name == b"x-forwarded-for":
+            forwarded.extend(hop.strip() for hop in value.decode("latin-1").split(","))
+    for hop in reversed(forwarded):
+        if not hop:
+            continue
+        if not is_trusted_proxy(hop):
+            return hop
+        address = hop
+    return address
@@ -0,0 +1,271 @@
+# Motord wordlist builder
+#
+# Rebuilds wordlists/efllex_wordlist_merged.jsonl from a source word list:
+#   1. every word is translated en->fr and en->sv (main translations)
+#   2. the sv translation is pivoted sv->fr and the fr translation fr->sv (alternates)
+#
+# Translations go through a pluggable Translator. Batches are spread over a process pool and
+# every result is stored in a content-addressed on-disk cache, so a rerun only translates
+# words (or models) it has not seen before.
+#
+# Usage:
+#   python build_wordlist.py source.jsonl -o wordlists/efllex_wordlist_merged.jsonl
+#   python build_wordlist.py source.jsonl -o /tmp/out.jsonl --translator stub --stub-mapping mapping.json
+#
+# The source is JSONL with one EFLLex record per line (word, pos_tag, difficulty, frequencies and
+# optionally total_frequency / significant_levels). A leading {"header": ...} line is skipped, so an
+# existing merged wordlist can be used as the source. The Marian translator needs `transformers`,
+# `sentencepiece` and `torch`, which are not part of the server requirements.
+
+import abc
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+# Supported language pairs
+LANGUAGE_PAIRS = {
+    ("en", "fr"): "Helsinki-NLP/opus-mt-en-fr",
+    ("fr", "en"): "Helsinki-NLP/opus-mt-fr-en",
+    ("en", "sv"): "Helsinki-NLP/opus-mt-en-sv",
+    ("sv", "en"): "Helsinki-NLP/opus-mt-sv-en",
+    ("fr", "sv"): "Helsinki-NLP/opus-mt-fr-sv",
+    ("sv", "fr"): "Helsinki-NLP/opus-mt-sv-fr",
+}
+
+CEFR_LEVELS = ["a1", "a2", "b1", "b2", "c1"]
+
+class Translator(abc.ABC):
+    """Translates batches of text between a language pair. Subclasses must be picklable."""
+
+    name = "base"
+
+    def model_id(self, source: str, target: str) -> str:
+        """Identifies the model used for a pair; part of the cache key and the output metadata"""
+        return f"{self.name}:{source}-{target}"
+
+    @abc.abstractmethod
+    def translate(self, texts: List[str], source: str, target: str) -> List[str]:
+        """Translate texts from source to target, one result per input, in order"""
+
+class MarianTranslator(Translator):
+    """Helsinki-NLP Marian models via transformers, loaded lazily once per process and pair"""
+
+    name = "marian"
+
+    def __init__(self, device: str = "cpu"):
+        self.device = device
+        self._models = {}
+
+    def model_id(self, source: str, target: str) -> str:
+        return LANGUAGE_PAIRS[(source, target)]
+
+    def _load(self, source: str, target: str):
+        if (source, target) not in self._models:
+            from transformers import MarianMTModel, MarianTokenizer
+            model_name = LANGUAGE_PAIRS[(source, target)]
+            tokenizer = MarianTokenizer.from_pretrained(model_name)
+            model = MarianMTModel.from_pretrained(model_name).to(self.device)
+            self._models[(source, target)] = (tokenizer, model)
+        return self._models[(source, target)]
+
+    def translate(self, texts: List[str], source: str, target: str) -> List[str]:
+        tokenizer, model = self._load(source, target)
+        batch = tokenizer(texts, return_tensors="pt", padding=True, truncation=True).to(self.device)
+        generated = model.generate(**batch)
+        return tokenizer.batch_decode(generated, skip_special_tokens=True)
+
+    def __getstate__(self):
+        # Models are never shipped to worker processes, each worker loads its own
+        return {"device": self.device, "_models": {}}
+
+class StubTranslator(Translator):
+    """Offline translator for tests: looks words up in a mapping, otherwise tags them with the target language"""
+
+    name = "stub"
+
+    def __init__(self, mapping: Optional[Dict[str, Dict[str, str]]] = None):
+        # mapping: "source-target" -> {text: translation}
+        self.mapping = mapping or {}
+
+    def translate(self, texts: List[str], source: str, target: str) -> List[str]:
+        pair_mapping = self.mapping.get(f"{source}-{target}", {})
+        return [pair_mapping.get(text, f"{text} ({target})") for text in texts]
+
+class TranslationCache:
+    """Content-addressed translation cache: one small JSON file per (model, text) pair"""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def key(model_id: str, source: str, target: str, text: str) -> str:
+        return hashlib.sha256("\0".join([model_id, source, target, text]).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return json.load(f)["translation"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put(self, key: str, text: str, translation: str):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file and rename so a killed run never leaves a truncated entry
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"text": text, "translation": translation}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+# Each worker process keeps one translator instance so models load once per process
+_worker_translator: Optional[Translator] = None
+
+def _init_worker(translator: Translator):
+    global _worker_translator
+    _worker_translator = translator
+
+def _translate_batch(args: Tuple[List[str], str, str]) -> List[str]:
+    texts, source, target = args
+    return _worker_translator.translate(texts, source, target)
+
+def translate_all(texts: List[str], source: str, target: str, translator: Translator, cache: TranslationCache,
+                  pool: Optional[ProcessPoolExecutor], batch_size: int) -> Dict[str, str]:
+    """Translate unique texts, serving hits from the cache and batching the misses across the pool"""
+    model_id = translator.model_id(source, target)
+    results = {}
+    misses = []
+    for text in dict.fromkeys(t for t in texts if t):
+        cached = cache.get(TranslationCache.key(model_id, source, target, text))
+        if cached is None:
+            misses.append(text)
+        else:
+            results[text] = cached
+    print(f"{source}->{target}: {len(results)} cached, {len(misses)} to translate")
+
+    batches = [misses[i:i + batch_size] for i in range(0, len(misses), batch_size)]
+    if pool is None:
+        translated_batches = (translator.translate(batch, source, target) for batch in batches)
+    else:
+        translated_batches = pool.map(_translate_batch, [(batch, source, target) for batch in batches])
+    for batch, translations in zip(batches, translated_batches):
+        for text, translation in zip(batch, translations):
+            cache.put(TranslationCache.key(model_id, source, target, text), text, translation)
+            results[text] = translation
+    return results
+
+def read_source_words(path: str) -> List[Dict]:
+    """Read EFLLex source records (JSONL), skipping a header line if present"""
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            obj = json.loads(line)
+            if "header" in obj or not obj.get("word"):
+                continue
+            frequencies = obj.get("frequencies", {})
+            records.append({
+                "word": obj["word"],
+                "pos_tag": obj.get("pos_tag", ""),
+                "difficulty": obj.get("difficulty", 0),
+                "frequencies": frequencies,
+                "total_frequency": obj.get("total_frequency", sum(frequencies.values())),
+                "significant_levels": obj.get("significant_levels", sum(1 for level in CEFR_LEVELS if frequencies.get(level, 0) > 0)),
+            })
+    return records
+
+def build_wordlist(records: List[Dict], translator: Translator, cache: TranslationCache,
+                   workers: int = 1, batch_size: int = 32) -> List[Dict]:
+    """Translate source records into merged wordlist records with main translations and pivot alternates"""
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(translator,)) if workers > 1 else None
+    try:
+        words = [r["word"] for r in records]
+        main = {target: translate_all(words, "en", target, translator, cache, pool, batch_size) for target in ["fr", "sv"]}
+        # Pivot each main translation through the other language to collect alternates
+        pivot_fr = translate_all(list(main["sv"].values()), "sv", "fr", translator, cache, pool, batch_size)
+        pivot_sv = translate_all(list(main["fr"].values()), "fr", "sv", translator, cache, pool, batch_size)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    merged = []
+    for record in records:
+        word = record["word"]
+        translation_fr = main["fr"].get(word, "")
+        translation_sv = main["sv"].get(word, "")
+        alternates = {"fr": [], "sv": []}
+        alternate_fr = pivot_fr.get(translation_sv, "")
+        if alternate_fr and alternate_fr.lower() != translation_fr.lower():
+            alternates["fr"].append({"word": word, "pos_tag": record["pos_tag"], "translation_fr": alternate_fr, "translation_sv": translation_sv, "source": "sv-fr-pivot"})
+        alternate_sv = pivot_sv.get(translation_fr, "")
+        if alternate_sv and alternate_sv.lower() != translation_sv.lower():
+            alternates["sv"].append({"word": word, "pos_tag": record["pos_tag"], "translation_fr": translation_fr, "translation_sv": alternate_sv, "source": "fr-sv-pivot"})
+        merged.append({
+            **record,
+            "translation_fr": translation_fr,
+            "translation_sv": translation_sv,
+            "metadata": {
+                "pos": record["pos_tag"],
+                "cefr_freq": record["frequencies"],
+                "translation_models": {
+                    "fr": {translator.name: translator.model_id("en", "fr")},
+                    "sv": {translator.name: translator.model_id("en", "sv")},
+                },
+            },
+            "alternates": alternates,
+        })
+    return merged
+
+def write_wordlist(path: str, words: List[Dict]):
+    """Write the merged wordlist (header line + one record per line), replacing the file atomically"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        header = {
+            "description": "Wordlist built by build_wordlist.py",
+            "source": "https://cental.uclouvain.be/cefrlex/efllex/",
+            "total_words": len(words),
+        }
+        f.write(json.dumps({"header": header}, ensure_ascii=False) + "\n")
+        for word in words:
+            f.write(json.dumps(word, ensure_ascii=False) + "\n")
+    os.replace(tmp_path, path)
+
+def make_translator(name: str, stub_mapping: Optional[str] = None, device: str = "cpu") -> Translator:
+    if name == "marian":
+        return MarianTranslator(device=device)
+    if name == "stub":
+        mapping = None
+        if stub_mapping:
+            with open(stub_mapping, "r", encoding="utf-8") as f:
+                mapping = json.load(f)
+        return StubTranslator(mapping)
+    raise ValueError(f"Unknown translator: {name}")
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Build a merged Motord wordlist from EFLLex source words")
+    parser.add_argument("source", help="Source word list (JSONL)")
+    parser.add_argument("-o", "--output", default="wordlists/efllex_wordlist_merged.jsonl", help="Output wordlist path")
+    parser.add_argument("--translator", choices=["marian", "stub"], default="marian")
+    parser.add_argument("--stub-mapping", help="JSON file of {\"en-fr\": {text: translation}, ...} for the stub translator")
+    parser.add_argument("--device", default="cpu", help="torch device for the Marian translator")
+    parser.add_argument("--cache-dir", default=".translation_cache", help="Directory of the on-disk translation cache")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (1 = translate in-process)")
+    parser.add_argument("--batch-size", type=int, default=32, help="Texts per translation batch")
+    args = parser.parse_args(argv)
+
+    translator = make_translator(args.translator, args.stub_mapping, args.device)
+    records = read_source_words(args.source)
+    print(f"Read {len(records)} source words from {args.source}")
+    words = build_wordlist(records, translator, TranslationCache(args.cache_dir), args.workers, args.batch_size)
+    write_wordlist(args.output, words)
+    print(f"Wrote {len(words)} words to {args.output}")
+
+if __name__ == "__main__":
+    main()
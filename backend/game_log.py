@@ -0,0 +1,181 @@
+# Motord game event log
+#
+# Append-only binary log of game events (join, start, guess, correct, timeout, end, leave).
+# The server appends events from the event loop without touching disk; a writer thread
+# writes them in batches and fsyncs on an interval.
+#
+# Record layout (little endian):
+#   u32 body length | u32 crc32(body) | body
+#   body = f64 unix timestamp | u8 event type | 16 byte lobby uuid | compact JSON payload
+#
+# A torn record at the end of the file (crash mid-write) fails its length or CRC check and
+# ends the read, so everything before it is still replayable.
+#
+# Usage:
+#   python game_log.py game_events.log                 # list games in the log
+#   python game_log.py game_events.log --lobby <id>    # replay every game of one lobby
+
+import argparse
+import json
+import os
+import struct
+import threading
+import time
+import uuid
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+RECORD_HEADER = struct.Struct("<II")
+BODY_HEADER = struct.Struct("<dB16s")
+
+EVENT_TYPES = {
+    "join": 1,
+    "start": 2,
+    "guess": 3,
+    "correct": 4,
+    "timeout": 5,
+    "end": 6,
+    "leave": 7,
+}
+EVENT_NAMES = {code: name for name, code in EVENT_TYPES.items()}
+
+def encode_event(event_type: str, lobby_id: str, payload: Dict, timestamp: Optional[float] = None) -> bytes:
+    """Encode one event as a length- and CRC-prefixed record"""
+    body = BODY_HEADER.pack(
+        time.time() if timestamp is None else timestamp,
+        EVENT_TYPES[event_type],
+        uuid.UUID(lobby_id).bytes
+    ) + json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return RECORD_HEADER.pack(len(body), zlib.crc32(body)) + body
+
+def read_events(path: str) -> Iterator[Tuple[float, str, str, Dict]]:
+    """Yield (timestamp, event type, lobby_id, payload) for every intact record in the log"""
+    with open(path, "rb") as f:
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            length, crc = RECORD_HEADER.unpack(header)
+            body = f.read(length)
+            if len(body) < length or zlib.crc32(body) != crc:
+                print(f"Stopping at damaged record at offset {f.tell() - len(body) - RECORD_HEADER.size}")
+                return
+            timestamp, code, lobby_bytes = BODY_HEADER.unpack_from(body)
+            payload = json.loads(body[BODY_HEADER.size:].decode("utf-8"))
+            yield timestamp, EVENT_NAMES.get(code, f"unknown:{code}"), str(uuid.UUID(bytes=lobby_bytes)), payload
+
+class GameEventLog:
+    """Batched append-only writer. log() never blocks on disk; a daemon thread does the writing."""
+
+    def __init__(self, path: str, flush_interval: float = 1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._pending: List[bytes] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name="game-event-log", daemon=True)
+            self._thread.start()
+
+    def log(self, event_type: str, lobby_id: str, payload: Dict):
+        """Queue an event; encoding is cheap, the write happens on the next flush"""
+        record = encode_event(event_type, lobby_id, payload)
+        with self._lock:
+            self._pending.append(record)
+
+    def _run(self):
+        with open(self.path, "ab") as f:
+            while not self._stop.wait(self.flush_interval):
+                self._flush(f)
+            self._flush(f)
+
+    def _flush(self, f):
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
+        try:
+            f.write(b"".join(batch))
+            f.flush()
+            os.fsync(f.fileno())
+        except OSError as e:
+            print(f"Error writing game event log: {e}")
+
+    def stop(self):
+        """Flush what is pending and stop the writer thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+def replay_games(events: Iterator[Tuple[float, str, str, Dict]], lobby_id: Optional[str] = None) -> List[Dict]:
+    """Rebuild games (players, words, scores) from events, one entry per start..end span"""
+    games: List[Dict] = []
+    current: Dict[str, Dict] = {}  # lobby_id -> game in progress
+    for timestamp, event_type, event_lobby_id, payload in events:
+        if lobby_id and event_lobby_id != lobby_id:
+            continue
+        game = current.get(event_lobby_id)
+        if event_type == "start":
+            game = {
+                "lobby_id": event_lobby_id,
+                "started_at": timestamp,
+                "ended_at": None,
+                "players": {p["id"]: {**p, "score": 0} for p in payload.get("players", [])},
+                "words": [],
+                "current_word": payload.get("word"),
+                "guesses": 0,
+                "winner": None,
+            }
+            current[event_lobby_id] = game
+            games.append(game)
+        elif game is None:
+            continue
+        elif event_type == "join":
+            game["players"].setdefault(payload["player_id"], {"id": payload["player_id"], "name": payload.get("name"), "score": 0})
+        elif event_type == "guess":
+            game["guesses"] += 1
+            if not payload.get("correct") and payload.get("player_id") in game["players"]:
+                game["players"][payload["player_id"]]["score"] = payload.get("score", 0)
+        elif event_type == "correct":
+            game["words"].append({"word": game["current_word"], "status": "correct", "winner_id": payload.get("player_id"), "time_taken": payload.get("time_taken"), "points": payload.get("points")})
+            if payload.get("player_id") in game["players"]:
+                game["players"][payload["player_id"]]["score"] = payload.get("score", 0)
+            game["current_word"] = payload.get("next_word")
+        elif event_type == "timeout":
+            game["words"].append({"word": game["current_word"], "status": "timeout"})
+            game["current_word"] = payload.get("next_word")
+        elif event_type == "end":
+            game["ended_at"] = timestamp
+            game["winner"] = payload.get("winner_id")
+            for player in payload.get("players", []):
+                game["players"].setdefault(player["id"], {"id": player["id"], "name": player.get("name")})["score"] = player.get("score", 0)
+            del current[event_lobby_id]
+    return games
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Inspect and replay a Motord game event log")
+    parser.add_argument("path", help="Game event log file")
+    parser.add_argument("--lobby", help="Only replay games of this lobby")
+    args = parser.parse_args(argv)
+
+    games = replay_games(read_events(args.path), args.lobby)
+    for game in games:
+        started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(game["started_at"]))
+        status = "finished" if game["ended_at"] else "unfinished"
+        print(f"Lobby {game['lobby_id']} game at {started} ({status}, {len(game['words'])} words, {game['guesses']} guesses)")
+        if args.lobby:
+            for word in game["words"]:
+                winner = game["players"].get(word.get("winner_id"), {}).get("name", "-")
+                print(f"  {word['word']}: {word['status']} {winner}")
+            for player in sorted(game["players"].values(), key=lambda p: -p.get("score", 0)):
+                print(f"  {player.get('name')}: {player.get('score', 0)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+# Motord leaderboard
+#
+# Every player's result of a finished game (score, highest streak, fastest guess) is stored in a
+# local SQLite database. The server records results from the event loop without touching disk;
+# a writer thread inserts them in batched transactions.
+#
+# The top K results of each board (the global board and one per language) are kept in memory as
+# sorted lists, loaded from the database at startup and updated as games end, so reading a
+# leaderboard is a slice of at most K entries and never waits on SQLite.
+#
+# Ranking: higher score first, then higher streak, then faster guess, then earlier finish.
+
+import bisect
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+GLOBAL_BOARD = "global"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    finished_at REAL NOT NULL,
+    lobby_id TEXT NOT NULL,
+    player_id TEXT NOT NULL,
+    player_name TEXT NOT NULL,
+    language TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    highest_streak INTEGER NOT NULL,
+    fastest_guess REAL NOT NULL,
+    won INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_rank ON results (score DESC, highest_streak DESC, fastest_guess, finished_at);
+CREATE INDEX IF NOT EXISTS results_language_rank ON results (language, score DESC, highest_streak DESC, fastest_guess, finished_at);
+"""
+COLUMNS = ("finished_at", "lobby_id", "player_id", "player_name", "language", "score", "highest_streak", "fastest_guess", "won")
+ORDER_BY = "ORDER BY score DESC, highest_streak DESC, fastest_guess, finished_at"
+
+class TopK:
+    """The best k results of one board, kept sorted by rank key"""
+
+    def __init__(self, k: int):
+        self.k = k
+        self.keys: List[Tuple] = []
+        self.results: List[Dict] = []
+
+    def offer(self, key: Tuple, result: Dict) -> bool:
+        """Insert a result if it ranks within the top k; O(k)"""
+        if len(self.keys) >= self.k and key >= self.keys[-1]:
+            return False
+        index = bisect.bisect_right(self.keys, key)
+        self.keys.insert(index, key)
+        self.results.insert(index, result)
+        if len(self.keys) > self.k:
+            self.keys.pop()
+            self.results.pop()
+        return True
+
+    def top(self, limit: int) -> List[Dict]:
+        return self.results[:limit]
+
+class Leaderboard:
+    """SQLite-backed leaderboards with in-memory top-k boards and a batched writer thread"""
+
+    def __init__(self, path: str, k: int = 100, flush_interval: float = 2.0):
+        self.path = path
+        self.k = k
+        self.flush_interval = flush_interval
+        self.boards: Dict[str, TopK] = {GLOBAL_BOARD: TopK(k)}
+        self._sequence = itertools.count()  # Tie breaker, so equal results keep their insertion order
+        self._pending: List[Tuple] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Create the schema, load the top k of every board and start the writer thread"""
+        if self._thread is not None:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self.path)
+        try:
+            connection.executescript(SCHEMA)
+            self._load(connection)
+        finally:
+            connection.close()
+        self._thread = threading.Thread(target=self._run, name="leaderboard-writer", daemon=True)
+        self._thread.start()
+
+    def _load(self, connection: sqlite3.Connection):
+        columns = ", ".join(("id",) + COLUMNS)
+        rows = connection.execute(f"SELECT {columns} FROM results {ORDER_BY} LIMIT ?", (self.k,)).fetchall()
+        languages = [language for (language,) in connection.execute("SELECT DISTINCT language FROM results")]
+        for language in languages:
+            rows += connection.execute(f"SELECT {columns} FROM results WHERE language = ? {ORDER_BY} LIMIT ?", (language, self.k)).fetchall()
+        # Every row belongs on the global board and its language board, so a row returned by
+        # both queries only needs offering once
+        self.boards = {GLOBAL_BOARD: TopK(self.k)}
+        loaded = set()
+        for row_id, *values in rows:
+            if row_id not in loaded:
+                loaded.add(row_id)
+                self._offer(dict(zip(COLUMNS, values)))
+        print(f"Loaded leaderboards: {', '.join(f'{name} ({len(board.results)})' for name, board in self.boards.items())}")
+
+    def _offer(self, result: Dict):
+        key = (-result["score"], -result["highest_streak"], result["fastest_guess"], result["finished_at"], next(self._sequence))
+        self.boards[GLOBAL_BOARD].offer(key, result)
+        board = self.boards.get(result["language"])
+        if board is None:
+            board = self.boards[result["language"]] = TopK(self.k)
+        board.offer(key, result)
+
+    def record_game(self, lobby_id: str, players: List[Dict], winner_id: Optional[str]):
+        """Record every player's result of a finished game. Boards update now, the insert happens on the next flush."""
+        finished_at = time.time()
+        rows = []
+        for player in players:
+            result = {
+                "finished_at": finished_at,
+                "lobby_id": lobby_id,
+                "player_id": player["id"],
+                "player_name": player["name"],
+                "language": player["language"],
+                "score": player["score"],
+                "highest_streak": player["highest_streak"],
+                "fastest_guess": player["fastest_guess"],
+                "won": int(player["id"] == winner_id),
+            }
+            self._offer(result)
+            rows.append(tuple(result[column] for column in COLUMNS))
+        with self._lock:
+            self._pending.extend(rows)
+
+    def top(self, board: str = GLOBAL_BOARD, limit: Optional[int] = None) -> List[Dict]:
+        """The best results of a board, best first, read from memory"""
+        top_k = self.boards.get(board)
+        if top_k is None:
+            return []
+        return top_k.top(self.k if limit is None else limit)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def _run(self):
+        connection = sqlite3.connect(self.path)
+        try:
+            while not self._stop.wait(self.flush_interval):
+                self._flush(connection)
+            self._flush(connection)
+        finally:
+            connection.close()
+
+    def _flush(self, connection: sqlite3.Connection):
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        try:
+            with connection:  # One transaction per batch
+                connection.executemany(f"INSERT INTO results ({', '.join(COLUMNS)}) VALUES ({placeholders})", batch)
+        except sqlite3.Error as e:
+            print(f"Error writing leaderboard results: {e}")
+            # Keep the batch for the next flush rather than dropping finished games
+            with self._lock:
+                self._pending[:0] = batch
+
+    def stop(self):
+        """Write what is pending and stop the writer thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,126 @@
+# Motord event loop monitoring
+#
+# - LoopMonitor samples event loop lag (actual minus scheduled wakeup of a periodic sleep)
+#   into a histogram. A separate heartbeat task ticks at a quarter of the slow threshold, and a
+#   watchdog thread grabs the loop thread's stack whenever the heartbeat has been silent for
+#   longer than the threshold, so blocking handlers can be found whenever they start.
+# - sample_stacks / profile_loop produce on-demand profiles of the live process, as
+#   collapsed stacks (flamegraph input) or a pstats dump.
+
+import asyncio
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from typing import Dict, List, Optional
+
+LAG_BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000]  # Histogram upper bounds; larger lag goes to "inf"
+
+class LoopMonitor:
+    def __init__(self, interval: float = 0.25, slow_threshold: float = 0.1, max_slow_events: int = 50):
+        self.interval = interval  # Seconds between lag samples
+        self.slow_threshold = slow_threshold  # Loop stalls longer than this get their stack recorded
+        self.histogram = [0] * (len(LAG_BUCKETS_MS) + 1)
+        self.samples = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.slow_events = deque(maxlen=max_slow_events)
+        self.heartbeat_interval = slow_threshold / 4  # Short enough that a stall is seen within a quarter threshold of its start
+        self.last_beat = time.monotonic()
+        self.loop_thread_id: Optional[int] = None
+        self._tasks: List[asyncio.Task] = []
+        self._stall_recorded = False
+
+    def start(self):
+        """Start the lag sampler and heartbeat on the running loop, and the watchdog thread"""
+        self.loop_thread_id = threading.get_ident()
+        self.last_beat = time.monotonic()
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._sample_lag()), loop.create_task(self._heartbeat())]
+        threading.Thread(target=self._watchdog, name="loop-watchdog", daemon=True).start()
+
+    def record_lag(self, lag: float):
+        lag_ms = lag * 1000
+        bucket = next((i for i, bound in enumerate(LAG_BUCKETS_MS) if lag_ms <= bound), len(LAG_BUCKETS_MS))
+        self.histogram[bucket] += 1
+        self.samples += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+
+    async def _sample_lag(self):
+        while True:
+            scheduled = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self.record_lag(max(0.0, now - scheduled))
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            now = time.monotonic()
+            if self._stall_recorded:
+                # The loop is free again; replace the watchdog's estimate with the whole stall
+                self.slow_events[-1]["stalled_for"] = round(now - self.last_beat, 4)
+                self._stall_recorded = False
+            self.last_beat = now
+
+    def _watchdog(self):
+        while True:
+            time.sleep(self.heartbeat_interval)
+            stalled_for = time.monotonic() - self.last_beat
+            if stalled_for > self.slow_threshold and not self._stall_recorded:
+                # One stack per stall: the handler that is holding the loop right now
+                frame = sys._current_frames().get(self.loop_thread_id)
+                if frame is not None:
+                    self.slow_events.append({
+                        "at": time.time(),
+                        "stalled_for": round(stalled_for, 4),
+                        "stack": traceback.format_stack(frame),
+                    })
+                    self._stall_recorded = True
+
+    def snapshot(self) -> Dict:
+        buckets = {f"le_{bound}ms": count for bound, count in zip(LAG_BUCKETS_MS, self.histogram)}
+        buckets["inf"] = self.histogram[-1]
+        return {
+            "samples": self.samples,
+            "mean_lag_ms": round(self.total_lag / self.samples * 1000, 3) if self.samples else None,
+            "max_lag_ms": round(self.max_lag * 1000, 3),
+            "histogram": buckets,
+            "slow_threshold_ms": self.slow_threshold * 1000,
+            "slow_events": list(self.slow_events),
+        }
+
+def sample_stacks(thread_id: Optional[int], seconds: float, interval: float = 0.005) -> str:
+    """Sampling profile of one thread (all threads if None), as collapsed stacks "a;b;c count" """
+    counts: Counter = Counter()
+    own_thread = threading.get_ident()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for ident, frame in sys._current_frames().items():
+            if ident == own_thread or (thread_id is not None and ident != thread_id):
+                continue
+            stack: List[str] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                frame = frame.f_back
+            counts[";".join(reversed(stack))] += 1
+        time.sleep(interval)
+    return "\n".join(f"{stack} {count}" for stack, count in counts.most_common())
+
+async def profile_loop(seconds: float, limit: int = 60) -> str:
+    """Deterministic profile of everything the event loop runs for the next few seconds, as a pstats dump"""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.disable()
+    output = io.StringIO()
+    pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(limit)
+    return output.getvalue()
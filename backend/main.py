@@ -8,18 +8,28 @@
 
 import os
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Form, BackgroundTasks, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import Dict, List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Dict, List, Optional, Set, Tuple
 import uuid
 import json
+from collections import OrderedDict, deque
 from datetime import datetime, timedelta
 import asyncio
+import math
 import random
+import time
+
+from game_log import GameEventLog
+from leaderboard import GLOBAL_BOARD, Leaderboard
+from admission import AdmissionControlMiddleware, admission_controller
+from loop_monitor import LoopMonitor, profile_loop, sample_stacks
 
 app = FastAPI()
 
+# Rate limits run inside CORS so 429 responses still carry CORS headers
+app.add_middleware(AdmissionControlMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -30,8 +40,21 @@ app.add_middleware(
 
 @app.on_event("startup")
 async def startup_event():
-    """Start background cleanup task"""
+    """Start background cleanup and liveness tasks"""
     asyncio.create_task(cleanup_task())
+    asyncio.create_task(liveness_task())
+    asyncio.create_task(matchmaking_task())
+    asyncio.create_task(word_stats_task())
+    game_event_log.start()
+    leaderboard.start()
+    loop_monitor.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush pending game events, leaderboard results and word statistics"""
+    await asyncio.to_thread(game_event_log.stop)
+    await asyncio.to_thread(leaderboard.stop)
+    await snapshot_word_stats()
 
 async def cleanup_task():
     """Background task to clean up disconnected players"""
@@ -42,6 +65,27 @@ async def cleanup_task():
             print(f"Error in cleanup task: {e}")
         await asyncio.sleep(60)  # Run every minute
 
+WORDLISTS_DIR = 'wordlists'
+DEFAULT_WORDLIST = 'efllex_wordlist_merged'
+ADMIN_TOKEN = os.environ.get("MOTORD_ADMIN_TOKEN")  # Admin endpoints are disabled when unset
+GAME_LOG_PATH = os.environ.get("MOTORD_GAME_LOG", "game_events.log")
+WORD_STATS_PATH = os.environ.get("MOTORD_WORD_STATS", "word_stats.json")
+LEADERBOARD_PATH = os.environ.get("MOTORD_LEADERBOARD_DB", "leaderboard.db")
+
+class Clock:
+    """Source of wall and monotonic time for lobby lifetimes, tickets and liveness.
+
+    soak.py swaps in a clock it advances by hand to run hours of lobby churn in seconds.
+    """
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+clock = Clock()
+
 # Data models
 class Player(BaseModel):
     id: str
@@ -54,16 +98,21 @@ class Player(BaseModel):
     streak: int = 0  # Current streak count
     highest_streak: int = 0  # Highest streak achieved
     fastest_guess: float = 30.0  # Fastest guess time in seconds
+    claimed: bool = True  # False for a /classroom seat until its student joins with that name
 
 class Lobby(BaseModel):
     id: str
     host_id: str
     players: List[Player]
     difficulty: int = 2
+    typo_tolerance: int = 0  # Max edit distance accepted for a guess (0 = exact match only)
+    wordlist: str = DEFAULT_WORDLIST  # Name of the wordlist new games draw from
+    word_weighting: str = "uniform"  # How words are sampled, see WORD_WEIGHTINGS
     max_words: int = 10  # Changed from max_score to max_words
     created_at: datetime
     invite_code: str
-    last_activity: datetime = Field(default_factory=datetime.now)
+    last_activity: datetime = Field(default_factory=lambda: clock.now())
+    claim_deadline: Optional[datetime] = None  # Provisioned lobbies are kept until then even with nobody connected
 
 class GameState(BaseModel):
     current_word: str
@@ -76,6 +125,37 @@ class GameState(BaseModel):
     start_time: Optional[datetime] = None
     word_start_time: Optional[datetime] = None  # When current word started
     total_correct_words: int = 0  # Track total correct words for game end condition
+    wordlist: Optional["Wordlist"] = None  # Wordlist version this game started with
+    word_deck: Optional["WordDeck"] = None  # Shuffled word deck for this game
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+class MatchTicket(BaseModel):
+    id: str
+    player_name: str
+    language: str
+    difficulty: int
+    queued_at: datetime
+    status: str = "queued"  # queued, matched or cancelled
+    lobby_id: Optional[str] = None
+    player_id: Optional[str] = None
+    matched_at: Optional[datetime] = None
+
+class ClassroomPlayer(BaseModel):
+    name: str
+    language: str
+
+class ClassroomLobby(BaseModel):
+    players: List[ClassroomPlayer]  # The first player hosts the lobby
+    difficulty: int = 2
+    typo_tolerance: int = 0
+    wordlist: str = DEFAULT_WORDLIST
+    word_weighting: str = "uniform"
+    max_words: int = 10
+
+class ClassroomRequest(BaseModel):
+    lobbies: List[ClassroomLobby]
+    claim_hours: float = 12.0  # How long the lobbies wait for their students
 
 class ChatMessage(BaseModel):
     player_id: str
@@ -85,38 +165,220 @@ class ChatMessage(BaseModel):
 
 # In-memory storage (in production, use a database)
 lobbies: Dict[str, Lobby] = {}
-active_connections: Dict[str, List[WebSocket]] = {}
-player_connections: Dict[str, WebSocket] = {}  # Map player_id to WebSocket connection
 
 game_states: Dict[str, GameState] = {}  # Game state for each lobby
 still_playing_pending: Dict[str, datetime] = {}
 
-# Load word data from merged translated wordlist
-WORDS_DATA = []
+# Event loop lag histogram and stacks of handlers that block the loop (see loop_monitor.py)
+loop_monitor = LoopMonitor(slow_threshold=float(os.environ.get("MOTORD_SLOW_CALLBACK_MS", "100")) / 1000)
+MAX_PROFILE_SECONDS = 30.0
+profile_lock = asyncio.Lock()  # One on-demand profile at a time
 
-def load_words_data():
-    """Load words from the merged translated wordlist (JSONL format)"""
-    global WORDS_DATA
-    WORDS_DATA = []
+# Every game event is appended to a binary log by a background writer (see game_log.py)
+game_event_log = GameEventLog(GAME_LOG_PATH)
+
+# Finished games' results go to SQLite in batches; the top of each board stays in memory (see leaderboard.py)
+LEADERBOARD_SIZE = 100
+leaderboard = Leaderboard(LEADERBOARD_PATH, k=LEADERBOARD_SIZE)
+
+class WordStats:
+    """Streaming per-word aggregates, O(1) space. Solve times use Welford's running mean/variance."""
+
+    __slots__ = ("attempts", "solves", "timeouts", "mean_solve_time", "m2_solve_time")
+
+    def __init__(self, attempts: int = 0, solves: int = 0, timeouts: int = 0, mean_solve_time: float = 0.0, m2_solve_time: float = 0.0):
+        self.attempts = attempts  # Guesses submitted, right or wrong
+        self.solves = solves
+        self.timeouts = timeouts
+        self.mean_solve_time = mean_solve_time
+        self.m2_solve_time = m2_solve_time  # Sum of squared deviations from the mean
+
+    def record_solve(self, time_taken: float):
+        self.solves += 1
+        delta = time_taken - self.mean_solve_time
+        self.mean_solve_time += delta / self.solves
+        self.m2_solve_time += delta * (time_taken - self.mean_solve_time)
+
+    def to_dict(self) -> Dict:
+        rounds = self.solves + self.timeouts
+        return {
+            "attempts": self.attempts,
+            "solves": self.solves,
+            "timeouts": self.timeouts,
+            "solve_rate": self.solves / rounds if rounds else None,
+            "timeout_rate": self.timeouts / rounds if rounds else None,
+            "mean_solve_time": self.mean_solve_time if self.solves else None,
+            "solve_time_variance": self.m2_solve_time / (self.solves - 1) if self.solves > 1 else None,
+        }
+
+    def to_snapshot(self) -> List:
+        return [self.attempts, self.solves, self.timeouts, self.mean_solve_time, self.m2_solve_time]
+
+WORD_STATS_SNAPSHOT_INTERVAL = 60  # Seconds between word statistics snapshots
+FUSE_TIMEOUT_SLACK = 1.0  # A timeout is accepted this many seconds before the word's fuse runs out on the server clock
+word_stats: Dict[str, WordStats] = {}  # word -> aggregates, updated in place on every guess and timeout
+
+def get_word_stats(word: str) -> WordStats:
+    stats = word_stats.get(word)
+    if stats is None:
+        stats = word_stats[word] = WordStats()
+    return stats
+
+def load_word_stats():
+    """Restore word statistics from the last snapshot"""
     try:
-        with open('wordlists/efllex_wordlist_merged.jsonl', 'r', encoding='utf-8') as f:
-            header = f.readline()  # skip header
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    obj = json.loads(line)
-                    if obj.get('word'):
-                        WORDS_DATA.append(obj)
-                except Exception:
-                    continue
+        with open(WORD_STATS_PATH, 'r', encoding='utf-8') as f:
+            for word, values in json.load(f).items():
+                word_stats[word] = WordStats(*values)
+    except FileNotFoundError:
+        pass
     except Exception as e:
-        print(f"Error loading wordlist: {e}")
-        WORDS_DATA = []
+        print(f"Error loading word stats: {e}")
 
-# Load words on startup
-load_words_data()
+def write_word_stats_snapshot(snapshot: Dict[str, List]):
+    tmp_path = f"{WORD_STATS_PATH}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, separators=(",", ":"), ensure_ascii=False)
+    os.replace(tmp_path, WORD_STATS_PATH)
+
+async def snapshot_word_stats():
+    """Copy the aggregates on the event loop, write them to disk in a worker thread"""
+    snapshot = {word: stats.to_snapshot() for word, stats in word_stats.items()}
+    try:
+        await asyncio.to_thread(write_word_stats_snapshot, snapshot)
+    except Exception as e:
+        print(f"Error writing word stats: {e}")
+
+async def word_stats_task():
+    """Background task that snapshots word statistics"""
+    while True:
+        await asyncio.sleep(WORD_STATS_SNAPSHOT_INTERVAL)
+        await snapshot_word_stats()
+
+load_word_stats()
+
+# WebSocket liveness: the server pings idle sockets and reaps the ones that stay silent
+LIVENESS_SWEEP_INTERVAL = 5.0  # How often the shared liveness task runs (seconds)
+LIVENESS_PING_AFTER = 10.0  # Ping a socket once it has been silent this long
+LIVENESS_DEADLINE = 20.0  # Reap a socket once it has been silent this long
+WS_CLOSE_SUPERSEDED = 4000  # Close code for a socket replaced by the same player's reconnect; clients do not reconnect on it
+
+class Connection:
+    """One open WebSocket and what it belongs to"""
+
+    __slots__ = ("id", "websocket", "lobby_id", "kind", "player_id", "last_seen")
+
+    def __init__(self, websocket: WebSocket, lobby_id: str, kind: str):
+        self.id = str(uuid.uuid4())
+        self.websocket = websocket
+        self.lobby_id = lobby_id
+        self.kind = kind  # "player" or "spectator"
+        self.player_id: Optional[str] = None  # Set once the client identifies itself
+        self.last_seen = clock.monotonic()  # Monotonic time of the last received frame
+
+class ConnectionRegistry:
+    """Open WebSocket connections keyed by connection id, indexed by lobby and by player.
+
+    Adding, binding and removing are O(1). Player connections are indexed by lobby for
+    broadcasts; spectators are only tracked here for liveness and counts.
+    """
+
+    def __init__(self):
+        self.by_id: Dict[str, Connection] = {}
+        self.by_lobby: Dict[str, Dict[str, Connection]] = {}  # lobby_id -> connection id -> player connection
+        self.by_player: Dict[str, Connection] = {}  # player_id -> connection
+
+    def add(self, websocket: WebSocket, lobby_id: str, kind: str = "player") -> Connection:
+        connection = Connection(websocket, lobby_id, kind)
+        self.by_id[connection.id] = connection
+        if kind == "player":
+            self.by_lobby.setdefault(lobby_id, {})[connection.id] = connection
+        return connection
+
+    def bind_player(self, connection: Connection, player_id: str) -> Optional[Connection]:
+        """Attach a player to a connection; returns the connection it supersedes, if any.
+
+        Only a socket bound to the same player in the same lobby is superseded.
+        """
+        previous = self.by_player.get(player_id)
+        if connection.player_id and self.by_player.get(connection.player_id) is connection:
+            del self.by_player[connection.player_id]
+        connection.player_id = player_id
+        self.by_player[player_id] = connection
+        if previous is None or previous is connection or previous.lobby_id != connection.lobby_id:
+            return None
+        return previous
+
+    def unbind_player(self, player_id: str):
+        connection = self.by_player.pop(player_id, None)
+        if connection is not None:
+            connection.player_id = None
+
+    def remove(self, connection: Connection) -> bool:
+        """Drop a connection from every index; returns False if it was already gone"""
+        if self.by_id.pop(connection.id, None) is None:
+            return False
+        lobby_connections = self.by_lobby.get(connection.lobby_id)
+        if lobby_connections is not None:
+            lobby_connections.pop(connection.id, None)
+            if not lobby_connections:
+                del self.by_lobby[connection.lobby_id]
+        if connection.player_id and self.by_player.get(connection.player_id) is connection:
+            del self.by_player[connection.player_id]
+        return True
+
+    def lobby_connections(self, lobby_id: str) -> List[Connection]:
+        return list(self.by_lobby.get(lobby_id, {}).values())
+
+    def lobby_count(self, lobby_id: str) -> int:
+        return len(self.by_lobby.get(lobby_id, ()))
+
+    def counts(self) -> Dict[str, int]:
+        spectators = sum(1 for c in self.by_id.values() if c.kind == "spectator")
+        return {
+            "connections": len(self.by_id),
+            "player_connections": len(self.by_id) - spectators,
+            "spectator_connections": spectators,
+            "lobbies_with_connections": len(self.by_lobby),
+            "identified_players": len(self.by_player),
+        }
+
+connection_registry = ConnectionRegistry()
+
+# Spectators: read-only sockets served from a per-lobby feed, apart from player connections
+SPECTATOR_BACKLOG = 16  # Frames kept per lobby; spectators further behind skip ahead
+SPECTATOR_SKIPPED_TYPES = {"still_playing", "still_playing_cleared", "player_ready_changed"}  # Player-session frames
+SPECTATOR_HIDDEN_FIELDS = {"id", "player_id", "host_id", "winner_id", "is_host", "ready", "joined_at"}  # Player ids are credentials
+spectator_feeds: Dict[str, "SpectatorFeed"] = {}  # lobby_id -> feed, exists while the lobby has spectators
+
+# Matchmaking: tickets wait in FIFO queues indexed by (language, difficulty) and are
+# paired into new or partly filled lobbies in batches on each tick
+MATCHMAKING_LANGUAGES = {"sv", "fr"}
+MATCHMAKING_DIFFICULTIES = range(0, 4)
+MATCHMAKING_LOBBY_SIZE = 4  # Matchmade lobbies are filled up to this many players
+MATCHMAKING_TICK = 1.0  # Seconds between matching batches
+MATCHMAKING_TICKET_TTL = timedelta(seconds=300)  # Queued and matched tickets are dropped after this long
+matchmaking_tickets: Dict[str, MatchTicket] = {}  # ticket_id -> ticket
+matchmaking_queues: Dict[Tuple[str, int], "OrderedDict[str, None]"] = {}  # (language, difficulty) -> queued ticket ids
+matchmaking_open_lobbies: Dict[Tuple[str, int], "OrderedDict[str, None]"] = {}  # (language, difficulty) -> matchmade lobbies with free seats
+
+# Wordlists: every JSONL file in WORDLISTS_DIR is loaded as a named, immutable Wordlist.
+# A reload builds new Wordlist objects off the event loop and swaps the whole mapping in one
+# assignment, so games holding a reference keep the version they started with.
+wordlists: Dict[str, "Wordlist"] = {}  # name -> current version, replaced wholesale on reload
+wordlist_reload_lock = asyncio.Lock()
+
+def normalize_word_record(word_data: Dict):
+    """Lowercase a word record and its alternates in place for consistent display"""
+    word_data["word"] = word_data["word"].lower()
+    word_data["translation_sv"] = word_data.get("translation_sv", "").lower()
+    word_data["translation_fr"] = word_data.get("translation_fr", "").lower()
+    if "alternates" in word_data:
+        for lang in ["fr", "sv"]:
+            if lang in word_data["alternates"]:
+                for alt in word_data["alternates"][lang]:
+                    alt["translation_fr"] = alt.get("translation_fr", "").lower()
+                    alt["translation_sv"] = alt.get("translation_sv", "").lower()
 
 def normalize_word(word: str) -> str:
     """Normalize word by removing diacritics and special characters"""
@@ -129,15 +391,320 @@ def normalize_word(word: str) -> str:
     normalized = ''.join(c for c in normalized if c.isalnum() or c in ' -')
     return normalized.strip()
 
-def get_random_word(difficulty: int) -> Dict:
-    """Get a random word for the given difficulty"""
-    # Filter words by difficulty (words with difficulty <= selected difficulty)
-    available_words = [w for w in WORDS_DATA if w["difficulty"] <= difficulty]
-    if not available_words:
-        # Fallback to all words if no words match difficulty
-        available_words = WORDS_DATA
+# Typo tolerance: accepted answers are indexed by their deletion neighbourhood (SymSpell),
+# so a guess within edit distance k is found with a handful of dict lookups
+MAX_TYPO_DISTANCE = 2  # Highest typo_tolerance a lobby can select; the index is built for this distance
+TYPO_CHARS_PER_EDIT = 4  # Answers need this many characters per tolerated edit ("kan" stays exact)
+MAX_GUESS_LENGTH = 100  # Longer guesses are rejected before they reach matching
+
+def deletion_variants(word: str, max_distance: int) -> set:
+    """All strings reachable from word by deleting up to max_distance characters (including word itself)"""
+    variants = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))} - variants
+        variants |= frontier
+    return variants
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """Optimal string alignment distance (Levenshtein plus adjacent swaps), capped at max_distance + 1.
+
+    Only the diagonal band of width max_distance is computed, so the cost is O(len * max_distance).
+    """
+    too_far = max_distance + 1
+    if abs(len(a) - len(b)) > max_distance:
+        return too_far
+    before_previous_row = None
+    previous_row = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        row = [too_far] * (len(b) + 1)
+        if i <= max_distance:
+            row[0] = i
+        best = row[0]
+        for j in range(max(1, i - max_distance), min(len(b), i + max_distance) + 1):
+            distance = previous_row[j - 1] + (a[i - 1] != b[j - 1])
+            distance = min(distance, previous_row[j] + 1, row[j - 1] + 1)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                distance = min(distance, before_previous_row[j - 2] + 1)
+            row[j] = distance
+            best = min(best, distance)
+        if best > max_distance:
+            return too_far
+        before_previous_row, previous_row = previous_row, row
+    return min(previous_row[len(b)], too_far)
+
+class AnswerIndex:
+    """Normalized accepted answers for one word and target language, with their deletion index"""
+
+    def __init__(self, main_translation: str, alternate_translations: List[str]):
+        self.main_translation = main_translation
+        self.alternate_translations = alternate_translations
+        self.answers = {a for a in [main_translation] + alternate_translations if a}
+        self.max_length = max((len(a) for a in self.answers), default=0)
+        self.deletions: Dict[str, List[str]] = {}
+        for answer in self.answers:
+            for variant in deletion_variants(answer, self.allowed_distance(answer, MAX_TYPO_DISTANCE)):
+                self.deletions.setdefault(variant, []).append(answer)
+
+    @staticmethod
+    def allowed_distance(answer: str, max_distance: int) -> int:
+        return min(max_distance, len(answer) // TYPO_CHARS_PER_EDIT)
+
+    def match(self, normalized_input: str, max_distance: int = 0) -> Optional[str]:
+        """Return the accepted answer the input matches, or None"""
+        if normalized_input in self.answers:
+            return normalized_input
+        if max_distance <= 0:
+            return None
+        # Anything longer is out of reach of every answer; also keeps the variant set from blowing up
+        if len(normalized_input) > self.max_length + max_distance:
+            return None
+        for variant in deletion_variants(normalized_input, min(max_distance, MAX_TYPO_DISTANCE)):
+            for answer in self.deletions.get(variant, ()):
+                allowed = self.allowed_distance(answer, max_distance)
+                if allowed and edit_distance(normalized_input, answer, allowed) <= allowed:
+                    return answer
+        return None
+
+def build_answer_indexes(word_data: Dict) -> Dict[str, AnswerIndex]:
+    """Build the answer index for each target language of a word record"""
+    indexes = {}
+    for target_language in ["sv", "fr"]:
+        main_translation = normalize_word(word_data.get(f"translation_{target_language}", ""))
+        alternate_translations = []
+        for alt in word_data.get("alternates", {}).get(target_language, []):
+            alt_translation = alt.get(f"translation_{target_language}", "")
+            if alt_translation:
+                alternate_translations.append(normalize_word(alt_translation))
+        indexes[target_language] = AnswerIndex(main_translation, alternate_translations)
+    return indexes
+
+# Word sampling weights derived from total_frequency; "uniform" uses the shuffled WordDeck
+WORD_WEIGHTINGS = {
+    "uniform": None,
+    "frequency": lambda frequency: frequency,
+    "sqrt_frequency": math.sqrt,  # Favours common words, but less steeply
+}
+WEIGHTED_REPEAT_RETRIES = 8  # Redraws a weighted deck tries before allowing a repeat
+
+class AliasTable:
+    """Vose alias table: O(n) to build, O(1) per weighted draw"""
+
+    def __init__(self, weights: List[float]):
+        n = len(weights)
+        total = sum(weights)
+        self.probability = [1.0] * n
+        self.alias = list(range(n))
+        if not n or total <= 0:
+            return
+        scaled = [w * n / total for w in weights]
+        small = [i for i, w in enumerate(scaled) if w < 1.0]
+        large = [i for i, w in enumerate(scaled) if w >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Leftovers are 1.0 up to rounding error
+        for i in small + large:
+            self.probability[i] = 1.0
+
+    def sample(self) -> int:
+        i = random.randrange(len(self.probability))
+        return i if random.random() < self.probability[i] else self.alias[i]
+
+class WordlistLoadError(Exception):
+    """A wordlist file could not be read or held no words"""
+
+class Wordlist:
+    """One loaded version of a wordlist with its lookup indexes. Word records are never mutated after loading."""
+
+    def __init__(self, name: str, words: List[Dict]):
+        self.name = name
+        self.words = words
+        self.loaded_at = datetime.now()
+        self.words_by_name: Dict[str, Dict] = {w["word"]: w for w in words}
+        self.answer_indexes: Dict[str, Dict[str, AnswerIndex]] = {w["word"]: build_answer_indexes(w) for w in words}
+        self.difficulty_pools: Dict[int, List[int]] = {}  # difficulty -> indices into words, built on first use
+        self.alias_tables: Dict[Tuple[str, int, str], Tuple[List[int], AliasTable]] = {}  # (weighting, difficulty, language) -> (pool, table)
+
+    @classmethod
+    def from_file(cls, name: str, path: str) -> "Wordlist":
+        """Load words from a merged translated wordlist (JSONL format).
+
+        Raises WordlistLoadError if the file cannot be read, has a line that is not a JSON record, yields
+        no words, or holds a different number of words than its header's total_words, so a
+        missing, truncated or half-copied file never replaces a working version.
+        """
+        words = []
+        header = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line_number, line in enumerate(f, start=1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        obj = json.loads(line)
+                    except ValueError as e:
+                        raise WordlistLoadError(f"malformed line {line_number} in {path}: {e}") from e
+                    if not isinstance(obj, dict):
+                        raise WordlistLoadError(f"malformed line {line_number} in {path}: not a word record")
+                    if line_number == 1 and 'header' in obj:
+                        header = obj['header']
+                        continue
+                    if obj.get('word'):
+                        normalize_word_record(obj)
+                        words.append(obj)
+        except (OSError, UnicodeDecodeError) as e:
+            raise WordlistLoadError(f"cannot read {path}: {e}") from e
+        if not words:
+            raise WordlistLoadError(f"no words in {path}")
+        expected = header.get('total_words')
+        if expected is not None and len(words) != expected:
+            raise WordlistLoadError(f"{path} has {len(words)} words, its header says {expected}")
+        return cls(name, words)
+
+    def get_difficulty_pool(self, difficulty: int) -> List[int]:
+        """Indices of words with difficulty <= the selected difficulty (cached per difficulty)"""
+        if difficulty not in self.difficulty_pools:
+            pool = [i for i, w in enumerate(self.words) if w["difficulty"] <= difficulty]
+            if not pool:
+                # Fallback to all words if no words match difficulty
+                pool = list(range(len(self.words)))
+            self.difficulty_pools[difficulty] = pool
+        return self.difficulty_pools[difficulty]
+
+    def get_alias_table(self, weighting: str, difficulty: int, language: str) -> Tuple[List[int], AliasTable]:
+        """Weighted sampling table over the difficulty pool, limited to words translated into language ("all" = every language)"""
+        key = (weighting, difficulty, language)
+        if key not in self.alias_tables:
+            languages = ["sv", "fr"] if language == "all" else [language]
+            weight_of = WORD_WEIGHTINGS[weighting]
+            pool = [i for i in self.get_difficulty_pool(difficulty)
+                    if all(self.words[i].get(f"translation_{lang}") for lang in languages)]
+            weights = [weight_of(max(self.words[i].get("total_frequency", 0.0), 0.0)) for i in pool]
+            self.alias_tables[key] = (pool, AliasTable(weights))
+        return self.alias_tables[key]
+
+def available_wordlist_names() -> List[str]:
+    """Names of the wordlist files in WORDLISTS_DIR"""
+    try:
+        return sorted(f[:-len('.jsonl')] for f in os.listdir(WORDLISTS_DIR) if f.endswith('.jsonl'))
+    except OSError as e:
+        print(f"Error listing wordlists: {e}")
+        return []
+
+def load_wordlists(names: Optional[List[str]] = None) -> Tuple[Dict[str, Wordlist], Dict[str, str]]:
+    """Build fresh Wordlist objects for the given names (all available wordlists by default).
+
+    Returns the lists that loaded and, separately, the error of each list that did not.
+    """
+    if names is None:
+        names = available_wordlist_names()
+    loaded, failed = {}, {}
+    for name in names:
+        try:
+            loaded[name] = Wordlist.from_file(name, os.path.join(WORDLISTS_DIR, f"{name}.jsonl"))
+        except WordlistLoadError as e:
+            print(f"Error loading wordlist {name}: {e}")
+            failed[name] = str(e)
+    return loaded, failed
+
+def load_words_data():
+    """Load all wordlists synchronously (used once at import)"""
+    global wordlists
+    wordlists, _ = load_wordlists()
+
+async def reload_wordlists(names: Optional[List[str]] = None) -> Tuple[Dict[str, Wordlist], Dict[str, str]]:
+    """Rebuild wordlists in a worker thread and swap in the ones that loaded atomically.
+
+    A list that fails to load keeps its current version.
+    """
+    global wordlists
+    async with wordlist_reload_lock:
+        fresh, failed = await asyncio.to_thread(load_wordlists, names)
+        # Copy-on-write: running games keep their references to the old versions
+        wordlists = {**wordlists, **fresh}
+    return fresh, failed
+
+def get_wordlist(name: str = DEFAULT_WORDLIST) -> Wordlist:
+    """Current version of a wordlist, falling back to the default (or an empty list)"""
+    return wordlists.get(name) or wordlists.get(DEFAULT_WORDLIST) or Wordlist(name, [])
+
+# Load words on startup
+load_words_data()
+
+class WordDeck:
+    """Lazily shuffled deck over a difficulty pool.
+
+    Holds a sparse Fisher-Yates permutation of pool positions, so creating a deck
+    is O(1), each draw is O(1), and no word repeats until the pool is used up.
+    """
+
+    def __init__(self, wordlist: Wordlist, difficulty: int):
+        self.wordlist = wordlist
+        self.difficulty = difficulty
+        self.pool = wordlist.get_difficulty_pool(difficulty)  # Shared, never mutated
+        self.swaps: Dict[int, int] = {}  # Pool position -> pool position, only for displaced entries
+        self.position = 0
+
+    def draw(self) -> Dict:
+        if self.position >= len(self.pool):
+            # Pool used up, start a fresh shuffle
+            self.swaps.clear()
+            self.position = 0
+        i = self.position
+        j = random.randrange(i, len(self.pool))
+        picked = self.swaps.get(j, j)
+        self.swaps[j] = self.swaps.pop(i, i)
+        self.position += 1
+        return self.wordlist.words[self.pool[picked]]
+
+class WeightedWordDeck(WordDeck):
+    """Frequency-weighted deck drawing from a precomputed alias table in O(1).
+
+    Draws are with replacement; a few redraws keep words from repeating within a game.
+    """
+
+    def __init__(self, wordlist: Wordlist, difficulty: int, weighting: str, language: str):
+        self.wordlist = wordlist
+        self.difficulty = difficulty
+        self.pool, self.table = wordlist.get_alias_table(weighting, difficulty, language)
+        self.drawn: Set[int] = set()  # Positions in pool already drawn this game
+
+    def draw(self) -> Dict:
+        if len(self.drawn) >= len(self.pool):
+            self.drawn.clear()
+        for _ in range(WEIGHTED_REPEAT_RETRIES):
+            picked = self.table.sample()
+            if picked not in self.drawn:
+                break
+        self.drawn.add(picked)
+        return self.wordlist.words[self.pool[picked]]
+
+def lobby_target_language(lobby: "Lobby") -> str:
+    """Language every player in the lobby translates into, or "all" for mixed lobbies"""
+    targets = {"fr" if p.language == "sv" else "sv" for p in lobby.players}
+    return targets.pop() if len(targets) == 1 else "all"
+
+def new_word_deck(lobby: "Lobby", wordlist: Wordlist) -> WordDeck:
+    """Deck for a new game, following the lobby's word weighting"""
+    if WORD_WEIGHTINGS.get(lobby.word_weighting) is None:
+        return WordDeck(wordlist, lobby.difficulty)
+    deck = WeightedWordDeck(wordlist, lobby.difficulty, lobby.word_weighting, lobby_target_language(lobby))
+    # A language with no translated words at this difficulty falls back to the uniform deck
+    return deck if deck.pool else WordDeck(wordlist, lobby.difficulty)
+
+GameState.model_rebuild()
+
+def get_random_word(difficulty: int, deck: Optional[WordDeck] = None) -> Dict:
+    """Get a random word for the given difficulty, drawing from the game's deck when given"""
+    if deck is None:
+        deck = WordDeck(get_wordlist(), difficulty)
     
-    if not available_words:
+    if not deck.pool:
         # Ultimate fallback
         return {
             "word": "hello",
@@ -146,56 +713,43 @@ def get_random_word(difficulty: int) -> Dict:
             "translation_fr": "bonjour"
         }
     
-    word_data = random.choice(available_words)
-    # Normalize all words to lowercase for consistent display
-    word_data["word"] = word_data["word"].lower()
-    word_data["translation_sv"] = word_data.get("translation_sv", "").lower()
-    word_data["translation_fr"] = word_data.get("translation_fr", "").lower()
-    
-    # Also normalize alternates if they exist
-    if "alternates" in word_data:
-        for lang in ["fr", "sv"]:
-            if lang in word_data["alternates"]:
-                for alt in word_data["alternates"][lang]:
-                    alt["translation_fr"] = alt.get("translation_fr", "").lower()
-                    alt["translation_sv"] = alt.get("translation_sv", "").lower()
-    
-    return word_data
+    return deck.draw()
 
-def verify_translation(input_word: str, player_language: str, current_word_data: Dict) -> bool:
-    """Check if the translation is correct. Player must translate to the *other* language."""
+def verify_translation(input_word: str, player_language: str, current_word_data: Dict, max_distance: int = 0, wordlist: Optional[Wordlist] = None) -> bool:
+    """Check if the translation is correct. Player must translate to the *other* language.
+
+    With max_distance > 0, guesses within that many typos of an accepted answer also count.
+    """
     normalized_input = normalize_word(input_word)
     # Target language is the *other* language
     if player_language == "fr":
-        correct_translation = current_word_data.get("translation_sv", "")
-        alternates = current_word_data.get("alternates", {}).get("sv", [])
+        target_language = "sv"
     elif player_language == "sv":
-        correct_translation = current_word_data.get("translation_fr", "")
-        alternates = current_word_data.get("alternates", {}).get("fr", [])
+        target_language = "fr"
     else:
-        correct_translation = ""
-        alternates = []
-    
-    normalized_correct = normalize_word(correct_translation)
-    
-    # Extract translation values from alternate objects
-    alternate_translations = []
-    for alt in alternates:
-        if player_language == "fr":
-            alt_translation = alt.get("translation_sv", "")
-        else:  # player_language == "sv"
-            alt_translation = alt.get("translation_fr", "")
-        if alt_translation:
-            alternate_translations.append(normalize_word(alt_translation))
-    
-    # Check if input matches main translation or any alternate
-    match = normalized_input == normalized_correct or normalized_input in alternate_translations
-    
-    # Log when alternates are used for correct guesses
-    if match and normalized_input != normalized_correct:
-        print(f"🎯 ALTERNATE USED: word='{current_word_data.get('word', '')}', input='{input_word}' -> '{normalized_input}', player_lang='{player_language}', main_translation='{correct_translation}' -> '{normalized_correct}', matched_alternate='{normalized_input}', all_alternates={alternate_translations}")
+        return False
+    
+    if wordlist is None:
+        wordlist = get_wordlist()
+    indexes = wordlist.answer_indexes.get(current_word_data.get("word", ""))
+    if indexes is None:
+        # Word not from the loaded wordlist, index it on the fly
+        indexes = build_answer_indexes(current_word_data)
+    answer_index = indexes[target_language]
+    normalized_correct = answer_index.main_translation
+    alternate_translations = answer_index.alternate_translations
+    
+    # Check if input matches main translation or any alternate, within the allowed typos
+    matched = answer_index.match(normalized_input, max_distance)
+    match = matched is not None
+    
+    # Log when alternates or typo tolerance are used for correct guesses
+    if match and matched != normalized_input:
+        print(f"✏️ TYPO ACCEPTED: word='{current_word_data.get('word', '')}', input='{input_word}' -> '{normalized_input}', player_lang='{player_language}', matched='{matched}', max_distance={max_distance}")
+    elif match and normalized_input != normalized_correct:
+        print(f"🎯 ALTERNATE USED: word='{current_word_data.get('word', '')}', input='{input_word}' -> '{normalized_input}', player_lang='{player_language}', main_translation='{normalized_correct}', matched_alternate='{normalized_input}', all_alternates={alternate_translations}")
     else:
-        print(f"Translation check: input='{input_word}' -> '{normalized_input}', player_lang='{player_language}', correct='{correct_translation}' -> '{normalized_correct}', alternates={alternate_translations}, match={match}")
+        print(f"Translation check: input='{input_word}' -> '{normalized_input}', player_lang='{player_language}', correct='{normalized_correct}', alternates={alternate_translations}, match={match}")
     
     return match
 
@@ -225,12 +779,137 @@ def calculate_total_points(base_points: int, time_bonus: int, streak_multiplier:
 
 def update_lobby_activity(lobby_id: str):
     if lobby_id in lobbies:
-        lobbies[lobby_id].last_activity = datetime.now()
+        lobbies[lobby_id].last_activity = clock.now()
+
+def require_admin(request: Request):
+    """Reject the request unless it carries the configured admin token"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    if request.headers.get("X-Admin-Token") != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
 
 @app.get("/")
 def root():
     return {"message": "Motord Python Backend"}
 
+@app.get("/wordlists")
+def list_wordlists():
+    """List the loaded wordlists"""
+    return {
+        "default": DEFAULT_WORDLIST,
+        "wordlists": [{
+            "name": wordlist.name,
+            "words": len(wordlist.words),
+            "loaded_at": wordlist.loaded_at.isoformat()
+        } for wordlist in wordlists.values()]
+    }
+
+@app.post("/admin/wordlists/reload")
+async def reload_wordlists_endpoint(request: Request):
+    """Reload wordlists from disk without interrupting running games (admin only)"""
+    require_admin(request)
+    form = await request.form()
+    names = [name.strip() for name in form.get("names", "").split(",") if name.strip()] or None
+    if names:
+        missing = [name for name in names if name not in available_wordlist_names()]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Wordlists not found: {', '.join(missing)}")
+    
+    fresh, failed = await reload_wordlists(names)
+    print(f"Reloaded wordlists: {[(w.name, len(w.words)) for w in fresh.values()]}")
+    reloaded = {wordlist.name: len(wordlist.words) for wordlist in fresh.values()}
+    if failed:
+        # The lists that failed keep serving their previous version
+        raise HTTPException(status_code=422, detail={"reloaded": reloaded, "failed": failed})
+    return {"reloaded": reloaded}
+
+@app.get("/admin/loop")
+def loop_stats(request: Request):
+    """Event loop lag histogram and recent slow-callback stacks (admin only)"""
+    require_admin(request)
+    return loop_monitor.snapshot()
+
+@app.post("/admin/profile")
+async def profile_process(request: Request):
+    """Profile the live process for a few seconds (admin only).
+
+    format=collapsed samples the event loop thread's stack (flamegraph input),
+    format=pstats runs cProfile over everything the loop executes meanwhile.
+    """
+    require_admin(request)
+    form = await request.form()
+    try:
+        seconds = float(form.get("seconds", 5))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="seconds must be a number")
+    if not 0 < seconds <= MAX_PROFILE_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be between 0 and {MAX_PROFILE_SECONDS}")
+    profile_format = form.get("format", "collapsed")
+    if profile_format not in ("collapsed", "pstats"):
+        raise HTTPException(status_code=400, detail="format must be collapsed or pstats")
+    if profile_lock.locked():
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    
+    async with profile_lock:
+        if profile_format == "pstats":
+            result = await profile_loop(seconds)
+        else:
+            # The sampler runs in a worker thread so the loop keeps serving while it is observed
+            result = await asyncio.to_thread(sample_stacks, loop_monitor.loop_thread_id, seconds)
+    return PlainTextResponse(result)
+
+@app.get("/admin/metrics")
+def server_metrics(request: Request):
+    """Sizes of the in-memory state, so leaks show up as steady growth (admin only)"""
+    require_admin(request)
+    return {
+        "connections": connection_registry.counts(),
+        "lobbies": len(lobbies),
+        "game_states": len(game_states),
+        "still_playing_pending": len(still_playing_pending),
+        "spectator_feeds": len(spectator_feeds),
+        "matchmaking_tickets": len(matchmaking_tickets),
+        "admission_buckets": len(admission_controller.buckets),
+        "word_stats": len(word_stats),
+        "leaderboard_pending": leaderboard.pending(),
+    }
+
+@app.get("/stats/words")
+def list_word_stats(word: Optional[str] = None, sort: str = "attempts", limit: int = 50):
+    """Per-word play statistics, or one word's statistics when word is given"""
+    if word is not None:
+        if word.lower() not in word_stats:
+            raise HTTPException(status_code=404, detail="No statistics for this word")
+        return {"word": word.lower(), **word_stats[word.lower()].to_dict()}
+    
+    if sort not in ("attempts", "solves", "timeouts", "solve_rate", "timeout_rate", "mean_solve_time"):
+        raise HTTPException(status_code=400, detail="Unsupported sort field")
+    rows = [{"word": w, **stats.to_dict()} for w, stats in word_stats.items()]
+    rows.sort(key=lambda row: (row[sort] is not None, row[sort] or 0), reverse=True)
+    return {"total_words": len(rows), "words": rows[:max(limit, 0)]}
+
+@app.get("/leaderboard")
+def get_leaderboard(language: Optional[str] = None, limit: int = 20):
+    """Best game results overall, or of players of one language"""
+    if language is not None and language not in ["sv", "fr"]:
+        raise HTTPException(status_code=400, detail="Language must be 'sv' or 'fr'")
+    if not 0 < limit <= LEADERBOARD_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {LEADERBOARD_SIZE}")
+    board = language or GLOBAL_BOARD
+    return {
+        "board": board,
+        "entries": [{
+            "rank": rank,
+            "player_name": result["player_name"],
+            "language": result["language"],
+            "score": result["score"],
+            "highest_streak": result["highest_streak"],
+            "fastest_guess": result["fastest_guess"],
+            "won": bool(result["won"]),
+            "finished_at": datetime.fromtimestamp(result["finished_at"]).isoformat()
+        } for rank, result in enumerate(leaderboard.top(board, limit), start=1)]
+    }
+
 @app.post("/lobby/create")
 async def create_lobby(player_name: str = Form(...), language: str = Form(...)):
     """Create a new lobby and return the lobby ID"""
@@ -244,7 +923,7 @@ async def create_lobby(player_name: str = Form(...), language: str = Form(...)):
         language=language,
         is_host=True,
         ready=True,
-        joined_at=datetime.now(),
+        joined_at=clock.now(),
         score=0
     )
     
@@ -253,13 +932,13 @@ async def create_lobby(player_name: str = Form(...), language: str = Form(...)):
         host_id=player_id,
         players=[player],
         max_words=10,  # Default max score
-        created_at=datetime.now(),
+        created_at=clock.now(),
         invite_code=invite_code
     )
     
     lobbies[lobby_id] = lobby
-    active_connections[lobby_id] = []
     update_lobby_activity(lobby_id)
+    game_event_log.log("join", lobby_id, {"player_id": player_id, "name": player_name, "language": language, "is_host": True})
     
     return {
         "lobby_id": lobby_id,
@@ -275,13 +954,130 @@ async def create_lobby(player_name: str = Form(...), language: str = Form(...)):
                 "is_host": p.is_host,
                 "ready": p.ready,
                 "joined_at": p.joined_at.isoformat(),
-                "score": p.score
+                "score": p.score,
+                "claimed": p.claimed
             } for p in lobby.players],
             "difficulty": lobby.difficulty,
+            "typo_tolerance": lobby.typo_tolerance,
+            "wordlist": lobby.wordlist,
+            "word_weighting": lobby.word_weighting,
             "invite_code": lobby.invite_code
         }
     }
 
+MAX_CLASSROOM_LOBBIES = 50
+MAX_CLASSROOM_ROSTER = 40
+MAX_CLASSROOM_CLAIM_HOURS = 72.0
+
+def validate_classroom(request: ClassroomRequest) -> List[Dict]:
+    """Check every lobby and player of a classroom request in one pass, returning all problems found"""
+    errors = []
+    if not request.lobbies:
+        errors.append({"error": "At least one lobby is required"})
+    if len(request.lobbies) > MAX_CLASSROOM_LOBBIES:
+        errors.append({"error": f"At most {MAX_CLASSROOM_LOBBIES} lobbies per request"})
+    if not 0 < request.claim_hours <= MAX_CLASSROOM_CLAIM_HOURS:
+        errors.append({"error": f"claim_hours must be between 0 and {MAX_CLASSROOM_CLAIM_HOURS}"})
+    for i, spec in enumerate(request.lobbies):
+        if not spec.players:
+            errors.append({"lobby": i, "error": "A lobby needs at least one player"})
+        if len(spec.players) > MAX_CLASSROOM_ROSTER:
+            errors.append({"lobby": i, "error": f"At most {MAX_CLASSROOM_ROSTER} players per lobby"})
+        if spec.difficulty not in MATCHMAKING_DIFFICULTIES:
+            errors.append({"lobby": i, "error": "Unsupported difficulty"})
+        if spec.typo_tolerance < 0 or spec.typo_tolerance > MAX_TYPO_DISTANCE:
+            errors.append({"lobby": i, "error": f"Typo tolerance must be between 0 and {MAX_TYPO_DISTANCE}"})
+        if spec.wordlist not in wordlists:
+            errors.append({"lobby": i, "error": "Wordlist not found"})
+        if spec.word_weighting not in WORD_WEIGHTINGS:
+            errors.append({"lobby": i, "error": f"Word weighting must be one of: {', '.join(WORD_WEIGHTINGS)}"})
+        if spec.max_words < 1:
+            errors.append({"lobby": i, "error": "Max words must be at least 1"})
+        names = set()
+        for j, roster_player in enumerate(spec.players):
+            if not roster_player.name.strip():
+                errors.append({"lobby": i, "player": j, "error": "Player name is required"})
+            elif roster_player.name in names:
+                errors.append({"lobby": i, "player": j, "error": "Player name already taken"})
+            names.add(roster_player.name)
+            if roster_player.language not in MATCHMAKING_LANGUAGES:
+                errors.append({"lobby": i, "player": j, "error": "Unsupported language"})
+    return errors
+
+def lobby_roster(lobby: Lobby) -> dict:
+    """The whole player list of a lobby as one frame"""
+    return {
+        "type": "lobby_roster",
+        "host_id": lobby.host_id,
+        "players": [{
+            "id": p.id,
+            "name": p.name,
+            "language": p.language,
+            "is_host": p.is_host,
+            "ready": p.ready,
+            "joined_at": p.joined_at.isoformat(),
+            "score": p.score,
+            "claimed": p.claimed
+        } for p in lobby.players]
+    }
+
+@app.post("/classroom")
+async def create_classroom(request: ClassroomRequest):
+    """Create several lobbies with their player rosters in one request.
+
+    The whole request is validated before anything is created. Students take over their
+    seat by joining the lobby with their rostered name; each claim is broadcast as one
+    lobby_roster frame. Seats still unclaimed when the host starts are dropped. Lobbies are
+    kept for claim_hours even while nobody is connected.
+    """
+    errors = validate_classroom(request)
+    if errors:
+        raise HTTPException(status_code=400, detail=errors)
+    
+    created = []
+    for spec in request.lobbies:
+        lobby_id = str(uuid.uuid4())
+        now = clock.now()
+        players = [Player(
+            id=str(uuid.uuid4()),
+            name=roster_player.name,
+            language=roster_player.language,
+            is_host=j == 0,
+            ready=j == 0,  # The host is ready, like a lobby creator
+            joined_at=now,
+            score=0,
+            claimed=False
+        ) for j, roster_player in enumerate(spec.players)]
+        lobby = Lobby(
+            id=lobby_id,
+            host_id=players[0].id,
+            players=players,
+            difficulty=spec.difficulty,
+            typo_tolerance=spec.typo_tolerance,
+            wordlist=spec.wordlist,
+            word_weighting=spec.word_weighting,
+            max_words=spec.max_words,
+            created_at=now,
+            invite_code=generate_invite_code(),
+            claim_deadline=now + timedelta(hours=request.claim_hours)
+        )
+        lobbies[lobby_id] = lobby
+        update_lobby_activity(lobby_id)
+        for player in players:
+            game_event_log.log("join", lobby_id, {"player_id": player.id, "name": player.name, "language": player.language, "is_host": player.is_host})
+        created.append(lobby)
+    
+    print(f"Created classroom of {len(created)} lobbies with {sum(len(l.players) for l in created)} players")
+    return {
+        "lobbies": [{
+            "lobby_id": lobby.id,
+            "invite_code": lobby.invite_code,
+            "host_id": lobby.host_id,
+            "claim_deadline": lobby.claim_deadline.isoformat(),
+            "players": [{"id": p.id, "name": p.name, "language": p.language, "is_host": p.is_host} for p in lobby.players]
+        } for lobby in created]
+    }
+
 @app.get("/lobby/{lobby_id}")
 async def get_lobby(lobby_id: str):
     """Get lobby information"""
@@ -299,10 +1095,15 @@ async def get_lobby(lobby_id: str):
             "is_host": player.is_host,
             "ready": player.ready,
             "joined_at": player.joined_at.isoformat(),
-            "score": player.score
+            "score": player.score,
+            "claimed": player.claimed
         } for player in lobby.players],
         "difficulty": lobby.difficulty,
+        "typo_tolerance": lobby.typo_tolerance,
+        "wordlist": lobby.wordlist,
+        "word_weighting": lobby.word_weighting,
         "max_score": lobby.max_words,
+        "spectators": len(spectator_feeds[lobby_id].spectators) if lobby_id in spectator_feeds else 0,
         "invite_code": lobby.invite_code,
         "created_at": lobby.created_at.isoformat()
     }
@@ -315,45 +1116,56 @@ async def join_lobby(lobby_id: str, player_name: str = Form(...), language: str
     
     lobby = lobbies[lobby_id]
     
-    # Check if player name already exists in lobby
-    if any(player.name == player_name for player in lobby.players):
+    # Check if player name already exists in lobby; a seat pre-registered through
+    # /classroom is handed to the first student who joins with its name
+    player = next((p for p in lobby.players if p.name == player_name), None)
+    if player is not None and player.claimed:
         raise HTTPException(status_code=400, detail="Player name already taken")
     
-    player_id = str(uuid.uuid4())
-    player = Player(
-        id=player_id,
-        name=player_name,
-        language=language,
-        is_host=False,
-        ready=False,
-        joined_at=datetime.now(),
-        score=0
-    )
-    
-    lobby.players.append(player)
-    update_lobby_activity(lobby_id)
+    if player is not None:
+        player.claimed = True
+        player.language = language
+        player_id = player.id
+        update_lobby_activity(lobby_id)
+        print(f"Player {player.name} ({player_id}) claimed their seat in lobby {lobby_id}")
+        await broadcast_to_lobby(lobby_id, lobby_roster(lobby))
+    else:
+        player_id = str(uuid.uuid4())
+        player = Player(
+            id=player_id,
+            name=player_name,
+            language=language,
+            is_host=False,
+            ready=False,
+            joined_at=clock.now(),
+            score=0
+        )
+    
+        lobby.players.append(player)
+        update_lobby_activity(lobby_id)
+        game_event_log.log("join", lobby_id, {"player_id": player_id, "name": player_name, "language": language, "is_host": False})
     
-    # Notify other players via WebSocket
-    print(f"=== BACKEND: PLAYER JOINED ===")
-    print(f"Player {player.name} ({player_id}) joined lobby {lobby_id}")
-    print(f"Current lobby players count: {len(lobby.players)}")
-    print(f"Current lobby players: {[p.name for p in lobby.players]}")
+        # Notify other players via WebSocket
+        print(f"=== BACKEND: PLAYER JOINED ===")
+        print(f"Player {player.name} ({player_id}) joined lobby {lobby_id}")
+        print(f"Current lobby players count: {len(lobby.players)}")
+        print(f"Current lobby players: {[p.name for p in lobby.players]}")
     
-    broadcast_message = {
-        "type": "player_joined",
-        "player": {
-            "id": player.id,
-            "name": player.name,
-            "language": player.language,
-            "is_host": player.is_host,
-            "ready": player.ready,
-            "joined_at": player.joined_at.isoformat(),
-            "score": player.score
+        broadcast_message = {
+            "type": "player_joined",
+            "player": {
+                "id": player.id,
+                "name": player.name,
+                "language": player.language,
+                "is_host": player.is_host,
+                "ready": player.ready,
+                "joined_at": player.joined_at.isoformat(),
+                "score": player.score
+            }
         }
-    }
-    print(f"Broadcasting player_joined message: {broadcast_message}")
-    await broadcast_to_lobby(lobby_id, broadcast_message)
-    print(f"=== BACKEND: PLAYER JOINED COMPLETE ===")
+        print(f"Broadcasting player_joined message: {broadcast_message}")
+        await broadcast_to_lobby(lobby_id, broadcast_message)
+        print(f"=== BACKEND: PLAYER JOINED COMPLETE ===")
     
     return {
         "player_id": player_id,
@@ -367,9 +1179,13 @@ async def join_lobby(lobby_id: str, player_name: str = Form(...), language: str
                 "is_host": p.is_host,
                 "ready": p.ready,
                 "joined_at": p.joined_at.isoformat(),
-                "score": p.score
+                "score": p.score,
+                "claimed": p.claimed
             } for p in lobby.players],
             "difficulty": lobby.difficulty,
+            "typo_tolerance": lobby.typo_tolerance,
+            "wordlist": lobby.wordlist,
+            "word_weighting": lobby.word_weighting,
             "invite_code": lobby.invite_code
         }
     }
@@ -428,6 +1244,81 @@ async def update_difficulty(lobby_id: str, player_id: str = Form(...), difficult
     
     return {"difficulty": difficulty}
 
+@app.post("/lobby/{lobby_id}/typo_tolerance")
+async def update_typo_tolerance(lobby_id: str, player_id: str = Form(...), typo_tolerance: int = Form(...)):
+    """Update how many typos a guess may contain and still count (host only)"""
+    if lobby_id not in lobbies:
+        raise HTTPException(status_code=404, detail="Lobby not found")
+    
+    lobby = lobbies[lobby_id]
+    
+    if lobby.host_id != player_id:
+        raise HTTPException(status_code=403, detail="Only host can change typo tolerance")
+    
+    if typo_tolerance < 0 or typo_tolerance > MAX_TYPO_DISTANCE:
+        raise HTTPException(status_code=400, detail=f"Typo tolerance must be between 0 and {MAX_TYPO_DISTANCE}")
+    
+    lobby.typo_tolerance = typo_tolerance
+    update_lobby_activity(lobby_id)
+    
+    # Notify other players via WebSocket
+    await broadcast_to_lobby(lobby_id, {
+        "type": "typo_tolerance_changed",
+        "typo_tolerance": typo_tolerance
+    })
+    
+    return {"typo_tolerance": typo_tolerance}
+
+@app.post("/lobby/{lobby_id}/wordlist")
+async def update_wordlist(lobby_id: str, player_id: str = Form(...), wordlist: str = Form(...)):
+    """Choose which wordlist the next game draws from (host only)"""
+    if lobby_id not in lobbies:
+        raise HTTPException(status_code=404, detail="Lobby not found")
+    
+    lobby = lobbies[lobby_id]
+    
+    if lobby.host_id != player_id:
+        raise HTTPException(status_code=403, detail="Only host can change wordlist")
+    
+    if wordlist not in wordlists:
+        raise HTTPException(status_code=404, detail="Wordlist not found")
+    
+    lobby.wordlist = wordlist
+    update_lobby_activity(lobby_id)
+    
+    # Notify other players via WebSocket
+    await broadcast_to_lobby(lobby_id, {
+        "type": "wordlist_changed",
+        "wordlist": wordlist
+    })
+    
+    return {"wordlist": wordlist}
+
+@app.post("/lobby/{lobby_id}/word_weighting")
+async def update_word_weighting(lobby_id: str, player_id: str = Form(...), word_weighting: str = Form(...)):
+    """Choose between uniform and frequency-weighted word selection (host only)"""
+    if lobby_id not in lobbies:
+        raise HTTPException(status_code=404, detail="Lobby not found")
+    
+    lobby = lobbies[lobby_id]
+    
+    if lobby.host_id != player_id:
+        raise HTTPException(status_code=403, detail="Only host can change word weighting")
+    
+    if word_weighting not in WORD_WEIGHTINGS:
+        raise HTTPException(status_code=400, detail=f"Word weighting must be one of: {', '.join(WORD_WEIGHTINGS)}")
+    
+    lobby.word_weighting = word_weighting
+    update_lobby_activity(lobby_id)
+    
+    # Notify other players via WebSocket
+    await broadcast_to_lobby(lobby_id, {
+        "type": "word_weighting_changed",
+        "word_weighting": word_weighting
+    })
+    
+    return {"word_weighting": word_weighting}
+
 @app.post("/lobby/{lobby_id}/max_words")
 async def update_max_words(lobby_id: str, player_id: str = Form(...), max_words: int = Form(...)):
     """Update the maximum number of words to play to"""
@@ -465,9 +1356,20 @@ async def start_game(lobby_id: str, player_id: str = Form(...)):
     if not player or not player.is_host:
         raise HTTPException(status_code=403, detail="Only host can start the game")
     
-    if not all(p.ready for p in lobby.players):
+    # Classroom seats nobody claimed do not hold up the game and are dropped when it starts;
+    # the host starting it is evidently here
+    present = [p for p in lobby.players if p.claimed or p is player]
+    if not all(p.ready for p in present):
         raise HTTPException(status_code=400, detail="All players must be ready")
     
+    for p in lobby.players:
+        if not p.claimed and p is not player:
+            game_event_log.log("leave", lobby_id, {"player_id": p.id})
+            print(f"Dropping unclaimed seat {p.name} ({p.id}) from lobby {lobby_id}")
+    player.claimed = True
+    lobby.players = present
+    lobby.claim_deadline = None
+    
     # Reset all player scores and streaks for new game
     for p in lobby.players:
         p.score = 0
@@ -475,8 +1377,10 @@ async def start_game(lobby_id: str, player_id: str = Form(...)):
         p.highest_streak = 0
         p.fastest_guess = 30.0
     
-    # Get initial word
-    word_data = get_random_word(lobby.difficulty)
+    # Get initial word from a fresh deck for this game
+    wordlist = get_wordlist(lobby.wordlist)
+    word_deck = new_word_deck(lobby, wordlist)
+    word_data = get_random_word(lobby.difficulty, word_deck)
     current_word = word_data["word"]  # Already lowercase from get_random_word
     current_word_language = "en"
     current_word_translations = {
@@ -490,13 +1394,22 @@ async def start_game(lobby_id: str, player_id: str = Form(...)):
         current_word_language=current_word_language,
         current_word_translations=current_word_translations,
         is_active=True,
-        start_time=datetime.now(),
-        word_start_time=datetime.now(),  # Initialize word start time
-        total_correct_words=0
+        start_time=clock.now(),
+        word_start_time=clock.now(),  # Initialize word start time
+        total_correct_words=0,
+        wordlist=wordlist,
+        word_deck=word_deck
     )
     
     game_states[lobby_id] = game_state
     update_lobby_activity(lobby_id)
+    game_event_log.log("start", lobby_id, {
+        "word": current_word,
+        "difficulty": lobby.difficulty,
+        "max_words": lobby.max_words,
+        "wordlist": wordlist.name,
+        "players": [{"id": p.id, "name": p.name, "language": p.language} for p in lobby.players]
+    })
     
     # Broadcast game started message
     await broadcast_to_lobby(lobby_id, {
@@ -564,10 +1477,14 @@ async def play_again(lobby_id: str, request: Request):
 @app.post("/lobby/{lobby_id}/player/{player_id}/translate")
 async def check_translation(lobby_id: str, player_id: str, translation: str = Form(...)):
     """Check if a player's translation is correct"""
+    if len(translation) > MAX_GUESS_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Translation must be at most {MAX_GUESS_LENGTH} characters")
+    
     if lobby_id not in lobbies:
         raise HTTPException(status_code=404, detail="Lobby not found")
     
-    if lobby_id not in game_states:
+    # An ended game keeps its state until play again; a late guess must not end and record it twice
+    if lobby_id not in game_states or not game_states[lobby_id].is_active:
         raise HTTPException(status_code=400, detail="Game not active")
     
     lobby = lobbies[lobby_id]
@@ -584,7 +1501,8 @@ async def check_translation(lobby_id: str, player_id: str, translation: str = Fo
     game_state = game_states[lobby_id]
     
     # Get the full word data from the loaded wordlist (including alternates)
-    current_word_data = next((word for word in WORDS_DATA if word.get("word") == game_state.current_word), {
+    wordlist = game_state.wordlist or get_wordlist(lobby.wordlist)
+    current_word_data = wordlist.words_by_name.get(game_state.current_word, {
         "word": game_state.current_word,
         "translation_sv": game_state.current_word_translations.get("sv", ""),
         "translation_fr": game_state.current_word_translations.get("fr", ""),
@@ -592,15 +1510,19 @@ async def check_translation(lobby_id: str, player_id: str, translation: str = Fo
     })
     
     # Check if translation is correct
-    is_correct = verify_translation(translation, player.language, current_word_data)
+    is_correct = verify_translation(translation, player.language, current_word_data, lobby.typo_tolerance, wordlist)
+    current_word_stats = get_word_stats(game_state.current_word)
+    current_word_stats.attempts += 1
     
     if is_correct:
         # Calculate time taken for this word using word_start_time
         if game_state.word_start_time:
-            time_taken = (datetime.now() - game_state.word_start_time).total_seconds()
+            time_taken = (clock.now() - game_state.word_start_time).total_seconds()
         else:
             time_taken = 30.0  # Fallback if no start time
         
+        current_word_stats.record_solve(time_taken)
+        
         # Update fastest guess if this is faster
         if time_taken < player.fastest_guess:
             player.fastest_guess = time_taken
@@ -627,6 +1549,7 @@ async def check_translation(lobby_id: str, player_id: str, translation: str = Fo
         
         # Increment total correct words
         game_state.total_correct_words += 1
+        game_event_log.log("guess", lobby_id, {"player_id": player_id, "input": translation, "word": game_state.current_word, "correct": True, "score": player.score})
         
         # Add current word to history (only correct guesses)
         game_state.word_history.append({
@@ -649,6 +1572,17 @@ async def check_translation(lobby_id: str, player_id: str, translation: str = Fo
             
             # Find the player with the highest score
             winner = max(lobby.players, key=lambda p: p.score)
+            game_event_log.log("correct", lobby_id, {"player_id": player_id, "points": total_points, "time_taken": time_taken, "score": player.score, "next_word": None})
+            game_event_log.log("end", lobby_id, {
+                "winner_id": winner.id,
+                "players": [{
+                    "id": p.id,
+                    "name": p.name,
+                    "score": p.score,
+                    "highest_streak": p.highest_streak,
+                    "fastest_guess": p.fastest_guess
+                } for p in lobby.players]
+            })
             
             broadcast_message = {
                 "type": "game_ended",
@@ -665,6 +1599,7 @@ async def check_translation(lobby_id: str, player_id: str, translation: str = Fo
                     "fastest_guess": p.fastest_guess
                 } for p in lobby.players]
             }
+            leaderboard.record_game(lobby_id, broadcast_message["players"], winner.id)
             
             await broadcast_to_lobby(lobby_id, broadcast_message)
             
@@ -679,17 +1614,18 @@ async def check_translation(lobby_id: str, player_id: str, translation: str = Fo
             }
         
         # Get new word
-        new_word_data = get_random_word(lobby.difficulty)
+        new_word_data = get_random_word(lobby.difficulty, game_state.word_deck)
         current_word_language = "en"  # English words from the wordlist
         current_word_translations = {
             "sv": new_word_data.get("translation_sv", ""),
             "fr": new_word_data.get("translation_fr", "")
         }
         
+        game_event_log.log("correct", lobby_id, {"player_id": player_id, "points": total_points, "time_taken": time_taken, "score": player.score, "next_word": new_word_data["word"]})
         game_state.current_word = new_word_data["word"]  # Already lowercase from get_random_word
         game_state.current_word_language = current_word_language
         game_state.current_word_translations = current_word_translations
-        game_state.word_start_time = datetime.now()  # Set start time for new word
+        game_state.word_start_time = clock.now()  # Set start time for new word
         
         # Broadcast correct translation and new word
         broadcast_message = {
@@ -722,6 +1658,7 @@ async def check_translation(lobby_id: str, player_id: str, translation: str = Fo
         points_lost = 10
         player.score = max(0, player.score - points_lost)  # Don't go below 0
         player.streak = 0  # Reset streak on incorrect guess
+        game_event_log.log("guess", lobby_id, {"player_id": player_id, "input": translation, "word": game_state.current_word, "correct": False, "score": player.score})
         
         # DO NOT add incorrect guesses to word_history - only track points deduction
         
@@ -761,14 +1698,11 @@ async def leave_lobby(lobby_id: str, player_id: str):
     # Remove player from lobby
     lobby.players = [p for p in lobby.players if p.id != player_id]
     update_lobby_activity(lobby_id)
+    game_event_log.log("leave", lobby_id, {"player_id": player_id})
     
     # If no players left, delete the lobby
     if not lobby.players:
-        del lobbies[lobby_id]
-        if lobby_id in active_connections:
-            del active_connections[lobby_id]
-        if lobby_id in game_states:
-            del game_states[lobby_id]
+        await delete_lobby(lobby_id)
     else:
         # If host left, assign new host
         if lobby.host_id == player_id and lobby.players:
@@ -790,12 +1724,19 @@ async def handle_timeout(lobby_id: str):
     if lobby_id not in lobbies:
         raise HTTPException(status_code=404, detail="Lobby not found")
     
-    if lobby_id not in game_states:
+    if lobby_id not in game_states or not game_states[lobby_id].is_active:
         raise HTTPException(status_code=400, detail="Game not active")
     
     lobby = lobbies[lobby_id]
     game_state = game_states[lobby_id]
     
+    # Every client posts when its own fuse runs out. The first post after the fuse has burned
+    # moves to the next word; the rest arrive for a word that has just started and are ignored.
+    if game_state.word_start_time:
+        word_elapsed = (clock.now() - game_state.word_start_time).total_seconds()
+        if word_elapsed < game_state.fuse_max_time - FUSE_TIMEOUT_SLACK:
+            return {"status": "timeout_ignored"}
+    
     # Add timeout to word history
     game_state.word_history.append({
         "word": game_state.current_word,
@@ -805,23 +1746,26 @@ async def handle_timeout(lobby_id: str):
         "time_taken": None
     })
     
+    get_word_stats(game_state.current_word).timeouts += 1
+    
     # Reset all player streaks on timeout
     for player in lobby.players:
         player.streak = 0
     # update_lobby_activity(lobby_id) # REMOVED
     
     # Get new word
-    new_word_data = get_random_word(lobby.difficulty)
+    new_word_data = get_random_word(lobby.difficulty, game_state.word_deck)
     current_word_language = "en"
     current_word_translations = {
         "sv": new_word_data.get("translation_sv", ""),
         "fr": new_word_data.get("translation_fr", "")
     }
     
+    game_event_log.log("timeout", lobby_id, {"word": game_state.current_word, "next_word": new_word_data["word"]})
     game_state.current_word = new_word_data["word"]  # Already lowercase from get_random_word
     game_state.current_word_language = current_word_language
     game_state.current_word_translations = current_word_translations
-    game_state.word_start_time = datetime.now()  # Set start time for new word
+    game_state.word_start_time = clock.now()  # Set start time for new word
     
     # Broadcast timeout and new word
     broadcast_message = {
@@ -842,47 +1786,281 @@ async def handle_timeout(lobby_id: str):
     
     return {"status": "timeout_handled"}
 
-# Supported language pairs
-LANGUAGE_PAIRS = {
-    ("en", "fr"): "Helsinki-NLP/opus-mt-en-fr",
-    ("fr", "en"): "Helsinki-NLP/opus-mt-fr-en",
-    ("en", "sv"): "Helsinki-NLP/opus-mt-en-sv",
-    ("sv", "en"): "Helsinki-NLP/opus-mt-sv-en",
-    ("fr", "sv"): "Helsinki-NLP/opus-mt-fr-sv",
-    ("sv", "fr"): "Helsinki-NLP/opus-mt-sv-fr",
-}
+@app.post("/matchmaking/queue")
+async def queue_for_match(player_name: str = Form(...), language: str = Form(...), difficulty: int = Form(...)):
+    """Queue a player for a public game; poll the returned ticket until it is matched"""
+    if language not in MATCHMAKING_LANGUAGES:
+        raise HTTPException(status_code=400, detail="Unsupported language")
+    if difficulty not in MATCHMAKING_DIFFICULTIES:
+        raise HTTPException(status_code=400, detail="Unsupported difficulty")
+    
+    ticket = MatchTicket(
+        id=str(uuid.uuid4()),
+        player_name=player_name,
+        language=language,
+        difficulty=difficulty,
+        queued_at=clock.now()
+    )
+    matchmaking_tickets[ticket.id] = ticket
+    queue = matchmaking_queues.setdefault((language, difficulty), OrderedDict())
+    queue[ticket.id] = None
+    
+    return {"ticket_id": ticket.id, "status": ticket.status, "queue_length": len(queue)}
+
+@app.get("/matchmaking/{ticket_id}")
+async def get_match_ticket(ticket_id: str):
+    """Get the status of a matchmaking ticket"""
+    if ticket_id not in matchmaking_tickets:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    
+    ticket = matchmaking_tickets[ticket_id]
+    return {
+        "ticket_id": ticket.id,
+        "status": ticket.status,
+        "lobby_id": ticket.lobby_id,
+        "player_id": ticket.player_id,
+        "queued_at": ticket.queued_at.isoformat()
+    }
+
+@app.post("/matchmaking/{ticket_id}/cancel")
+async def cancel_match_ticket(ticket_id: str):
+    """Leave the matchmaking queue"""
+    if ticket_id not in matchmaking_tickets:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    
+    ticket = matchmaking_tickets[ticket_id]
+    if ticket.status != "queued":
+        raise HTTPException(status_code=400, detail="Ticket is no longer queued")
+    
+    matchmaking_queues.get((ticket.language, ticket.difficulty), {}).pop(ticket_id, None)
+    del matchmaking_tickets[ticket_id]
+    ticket.status = "cancelled"
+    return {"status": ticket.status}
+
+def seat_ticket(ticket: MatchTicket, lobby: Lobby) -> Player:
+    """Add a matched ticket's player to a lobby and mark the ticket matched"""
+    player = Player(
+        id=str(uuid.uuid4()),
+        name=ticket.player_name,
+        language=ticket.language,
+        is_host=not lobby.players,
+        ready=not lobby.players,  # The host is ready, like a lobby creator
+        joined_at=clock.now(),
+        score=0
+    )
+    if player.is_host:
+        lobby.host_id = player.id
+    lobby.players.append(player)
+    game_event_log.log("join", lobby.id, {"player_id": player.id, "name": player.name, "language": player.language, "is_host": player.is_host})
+    ticket.status = "matched"
+    ticket.lobby_id = lobby.id
+    ticket.player_id = player.id
+    ticket.matched_at = clock.now()
+    return player
+
+def has_free_seat(lobby_id: str) -> bool:
+    """A matchmade lobby can take more players while it exists, has room and has not started"""
+    lobby = lobbies.get(lobby_id)
+    return lobby is not None and 0 < len(lobby.players) < MATCHMAKING_LOBBY_SIZE and lobby_id not in game_states
+
+async def match_queued_players():
+    """One matching batch: fill partly filled lobbies first, then open new ones for waiting pairs"""
+    for key, queue in list(matchmaking_queues.items()):
+        language, difficulty = key
+        open_lobbies = matchmaking_open_lobbies.setdefault(key, OrderedDict())
+        
+        # Seat players in lobbies that still have room, oldest lobby first
+        while queue and open_lobbies:
+            lobby_id = next(iter(open_lobbies))
+            if not has_free_seat(lobby_id):
+                del open_lobbies[lobby_id]
+                continue
+            lobby = lobbies[lobby_id]
+            ticket_id, _ = queue.popitem(last=False)
+            player = seat_ticket(matchmaking_tickets[ticket_id], lobby)
+            update_lobby_activity(lobby_id)
+            await broadcast_to_lobby(lobby_id, {
+                "type": "player_joined",
+                "player": {
+                    "id": player.id,
+                    "name": player.name,
+                    "language": player.language,
+                    "is_host": player.is_host,
+                    "ready": player.ready,
+                    "joined_at": player.joined_at.isoformat(),
+                    "score": player.score
+                }
+            })
+        
+        # Pair the rest into new lobbies
+        while len(queue) >= 2:
+            lobby = Lobby(
+                id=str(uuid.uuid4()),
+                host_id="",
+                players=[],
+                difficulty=difficulty,
+                max_words=10,
+                created_at=clock.now(),
+                invite_code=generate_invite_code()
+            )
+            for _ in range(min(len(queue), MATCHMAKING_LOBBY_SIZE)):
+                ticket_id, _ = queue.popitem(last=False)
+                seat_ticket(matchmaking_tickets[ticket_id], lobby)
+            lobbies[lobby.id] = lobby
+            update_lobby_activity(lobby.id)
+            if len(lobby.players) < MATCHMAKING_LOBBY_SIZE:
+                open_lobbies[lobby.id] = None
+            print(f"Matchmaking created lobby {lobby.id} for {[p.name for p in lobby.players]} ({language}, difficulty {difficulty})")
+        
+        if not queue:
+            del matchmaking_queues[key]
+        if not open_lobbies:
+            del matchmaking_open_lobbies[key]
+
+def expire_match_tickets():
+    """Drop tickets that have waited or sat unclaimed past the TTL"""
+    now = clock.now()
+    for ticket_id, ticket in list(matchmaking_tickets.items()):
+        if now - (ticket.matched_at or ticket.queued_at) > MATCHMAKING_TICKET_TTL:
+            del matchmaking_tickets[ticket_id]
+            queue = matchmaking_queues.get((ticket.language, ticket.difficulty))
+            if queue is not None:
+                queue.pop(ticket_id, None)
+                if not queue:
+                    del matchmaking_queues[(ticket.language, ticket.difficulty)]
+
+async def matchmaking_task():
+    """Background task that runs matching in batches"""
+    while True:
+        try:
+            await match_queued_players()
+            expire_match_tickets()
+        except Exception as e:
+            print(f"Error in matchmaking task: {e}")
+        await asyncio.sleep(MATCHMAKING_TICK)
+
+class SpectatorFeed:
+    """Per-lobby spectator fan-out.
+
+    Frames are encoded once and appended to a short ring. Each spectator's writer
+    follows the ring at its own pace and skips ahead when it falls off the end, so a
+    slow spectator never holds up players or other spectators.
+    """
+
+    def __init__(self):
+        self.frames = deque(maxlen=SPECTATOR_BACKLOG)  # (seq, encoded frame)
+        self.seq = 0
+        self.new_frame = asyncio.Event()
+        self.spectators: Set["Connection"] = set()
+
+    def publish(self, frame: str):
+        self.seq += 1
+        self.frames.append((self.seq, frame))
+        # Wake current waiters once, later waiters get a fresh event
+        self.new_frame.set()
+        self.new_frame = asyncio.Event()
+
+async def pump_spectator_frames(websocket: WebSocket, feed: SpectatorFeed):
+    """Send feed frames to one spectator, skipping frames it was too slow to receive"""
+    next_seq = feed.seq + 1
+    try:
+        while True:
+            if feed.seq < next_seq:
+                await feed.new_frame.wait()
+                continue
+            oldest_seq = feed.frames[0][0]
+            if next_seq < oldest_seq:
+                print(f"Spectator lagging, skipped {oldest_seq - next_seq} frames")
+                next_seq = oldest_seq
+            await websocket.send_text(feed.frames[next_seq - oldest_seq][1])
+            next_seq += 1
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        # The reader side or the liveness task cleans up the socket
+        print(f"Spectator send failed: {e}")
+
+def spectator_view(value):
+    """Project a broadcast frame for spectators: the same event without player ids or lobby-session fields"""
+    if isinstance(value, dict):
+        return {key: spectator_view(item) for key, item in value.items() if key not in SPECTATOR_HIDDEN_FIELDS}
+    if isinstance(value, list):
+        return [spectator_view(item) for item in value]
+    return value
+
+def spectator_snapshot(lobby_id: str) -> dict:
+    """Current lobby and game state for a spectator that just connected"""
+    lobby = lobbies[lobby_id]
+    game_state = game_states.get(lobby_id)
+    return spectator_view({
+        "type": "spectator_snapshot",
+        "lobby": {
+            "difficulty": lobby.difficulty,
+            "max_words": lobby.max_words,
+            "players": [{
+                "id": p.id,
+                "name": p.name,
+                "score": p.score,
+                "language": p.language,
+                "streak": p.streak
+            } for p in lobby.players]
+        },
+        "game": {
+            "is_active": game_state.is_active,
+            "current_word": game_state.current_word,
+            "current_word_language": game_state.current_word_language,
+            "current_word_translations": game_state.current_word_translations,
+            "total_correct_words": game_state.total_correct_words
+        } if game_state else None
+    })
 
 async def broadcast_to_lobby(lobby_id: str, message: dict):
-    """Broadcast message to all connected players in a lobby"""
+    """Broadcast message to all connected players in a lobby, then hand it to the spectator feed"""
     print(f"=== BACKEND: BROADCAST START ===")
     print(f"Lobby ID: {lobby_id}")
     print(f"Message type: {message.get('type', 'unknown')}")
     print(f"Full message: {message}")
     
-    if lobby_id in active_connections:
-        print(f"Found {len(active_connections[lobby_id])} connections in lobby {lobby_id}")
-        disconnected = []
-        for i, connection in enumerate(active_connections[lobby_id]):
+    # Encode once for every recipient
+    message_json = json.dumps(message)
+    
+    connections = connection_registry.lobby_connections(lobby_id)
+    if connections:
+        print(f"Found {len(connections)} connections in lobby {lobby_id}")
+        for i, connection in enumerate(connections):
             try:
-                message_json = json.dumps(message)
-                print(f"Sending to connection {i}: {message_json}")
-                await connection.send_text(message_json)
+                await connection.websocket.send_text(message_json)
                 print(f"Successfully sent message to connection {i}")
             except Exception as e:
                 print(f"Failed to send message to connection {i}: {e}")
-                # Mark for removal
-                disconnected.append(connection)
-        
-        # Remove disconnected connections
-        for connection in disconnected:
-            if connection in active_connections[lobby_id]:
-                active_connections[lobby_id].remove(connection)
-                print(f"Removed disconnected connection from lobby {lobby_id}")
+                # Remove the dead connection; its endpoint's finally block finds it already gone
+                if connection_registry.remove(connection):
+                    print(f"Removed disconnected connection from lobby {lobby_id}")
     else:
         print(f"No active connections found for lobby {lobby_id}")
     
+    # Spectators get one projection of the frame, encoded once; their writers send it on their own time
+    feed = spectator_feeds.get(lobby_id)
+    if feed and message.get("type") not in SPECTATOR_SKIPPED_TYPES:
+        feed.publish(json.dumps(spectator_view(message)))
+    
     print(f"=== BACKEND: BROADCAST END ===")
 
+async def delete_lobby(lobby_id: str):
+    """Forget a lobby and everything keyed by it, and close its spectators. Open player connections go with their sockets."""
+    lobby = lobbies.pop(lobby_id, None)
+    game_states.pop(lobby_id, None)
+    still_playing_pending.pop(lobby_id, None)
+    if lobby is not None:
+        for key, open_lobbies in list(matchmaking_open_lobbies.items()):
+            open_lobbies.pop(lobby_id, None)
+            if not open_lobbies:
+                del matchmaking_open_lobbies[key]
+    # Spectators would otherwise stay on a dead feed, kept alive by their own pings
+    feed = spectator_feeds.pop(lobby_id, None)
+    if feed is not None:
+        await asyncio.gather(*(reap_connection(connection, "lobby deleted", code=4404) for connection in list(feed.spectators)))
+
 async def cleanup_disconnected_players():
     """Clean up inactive lobbies"""
     
@@ -891,55 +2069,118 @@ async def cleanup_disconnected_players():
         # Inactivity check (set to 5 minutes for production)
         inactivity_timeout = timedelta(seconds=300)
         popup_timeout = timedelta(seconds=30)
-        now = datetime.now()
+        now = clock.now()
         if lobby_id in still_playing_pending:
             # Already waiting for response
             popup_sent_time = still_playing_pending[lobby_id]
             if now - popup_sent_time > popup_timeout:
                 print(f"Lobby {lobby_id} inactive for 30s after popup, deleting lobby.")
-                del lobbies[lobby_id]
-                if lobby_id in active_connections:
-                    del active_connections[lobby_id]
-                if lobby_id in game_states:
-                    del game_states[lobby_id]
-                del still_playing_pending[lobby_id]
+                await delete_lobby(lobby_id)
             continue
         if now - lobby.last_activity > inactivity_timeout:
             # Only send still_playing popup if there are active connections to receive it
-            if lobby_id in active_connections and active_connections[lobby_id]:
+            if connection_registry.lobby_count(lobby_id):
                 print(f"Lobby {lobby_id} inactive for 5 minutes, sending still_playing popup.")
                 await broadcast_to_lobby(lobby_id, {"type": "still_playing", "timeout": 30})
                 still_playing_pending[lobby_id] = now
+            elif lobby.claim_deadline and now < lobby.claim_deadline:
+                # A provisioned classroom lobby waiting for its students
+                pass
             else:
-                print(f"Lobby {lobby_id} inactive for 5 minutes but no active connections, skipping still_playing popup.")
+                # Nobody is connected to answer the popup, the players closed their tabs without leaving
+                print(f"Lobby {lobby_id} inactive for 5 minutes with no active connections, deleting abandoned lobby.")
+                await delete_lobby(lobby_id)
+                continue
 
         # Only delete lobby if no players left AND no active connections
-        if not lobby.players and (lobby_id not in active_connections or not active_connections[lobby_id]):
+        if not lobby.players and not connection_registry.lobby_count(lobby_id):
             print(f"Deleting empty lobby {lobby_id} (no players and no active connections)")
-            del lobbies[lobby_id]
-            if lobby_id in active_connections:
-                del active_connections[lobby_id]
-            if lobby_id in game_states:
-                del game_states[lobby_id]
-        elif not lobby.players and lobby_id in active_connections and active_connections[lobby_id]:
-            print(f"Lobby {lobby_id} has no players but still has {len(active_connections[lobby_id])} active connections. Keeping lobby alive.")
+            await delete_lobby(lobby_id)
+        elif not lobby.players:
+            print(f"Lobby {lobby_id} has no players but still has {connection_registry.lobby_count(lobby_id)} active connections. Keeping lobby alive.")
+
+async def reap_connection(connection: Connection, reason: str, code: int = 1001):
+    """Forget a dead or superseded connection and close it without waiting on the peer"""
+    connection_registry.remove(connection)
+    print(f"Reaping WebSocket in lobby {connection.lobby_id}: {reason}")
+    try:
+        await asyncio.wait_for(connection.websocket.close(code=code), timeout=1.0)
+    except Exception:
+        pass
+
+async def check_connection_liveness():
+    """Ping idle WebSockets and reap the ones that missed the liveness deadline"""
+    now = clock.monotonic()
+    for connection in list(connection_registry.by_id.values()):
+        idle = now - connection.last_seen
+        if idle > LIVENESS_DEADLINE:
+            await reap_connection(connection, f"no frames for {idle:.1f}s")
+        elif idle > LIVENESS_PING_AFTER:
+            try:
+                await asyncio.wait_for(connection.websocket.send_text(json.dumps({"type": "ping"})), timeout=1.0)
+            except Exception as e:
+                await reap_connection(connection, f"ping failed: {e}")
+
+async def liveness_task():
+    """Single background task that drives liveness checks for every WebSocket"""
+    while True:
+        try:
+            await check_connection_liveness()
+        except Exception as e:
+            print(f"Error in liveness task: {e}")
+        await asyncio.sleep(LIVENESS_SWEEP_INTERVAL)
+
+@app.websocket("/ws/{lobby_id}/spectate")
+async def spectator_endpoint(websocket: WebSocket, lobby_id: str):
+    """Read-only lobby feed for spectators"""
+    if lobby_id not in lobbies:
+        await websocket.close(code=4404)
+        return
+    
+    await websocket.accept()
+    feed = spectator_feeds.setdefault(lobby_id, SpectatorFeed())
+    connection = connection_registry.add(websocket, lobby_id, kind="spectator")
+    feed.spectators.add(connection)
+    print(f"Spectator connected to lobby {lobby_id}. Total spectators: {len(feed.spectators)}")
+    
+    writer = None
+    try:
+        await websocket.send_text(json.dumps(spectator_snapshot(lobby_id)))
+        writer = asyncio.create_task(pump_spectator_frames(websocket, feed))
+        while True:
+            data = await websocket.receive_text()
+            connection.last_seen = clock.monotonic()
+            # Spectators are read-only, only keepalive messages are answered
+            if json.loads(data).get("type") == "ping":
+                await websocket.send_text(json.dumps({"type": "pong"}))
+    except WebSocketDisconnect:
+        print(f"Spectator disconnected from lobby {lobby_id}")
+    except Exception as e:
+        print(f"Spectator connection error in lobby {lobby_id}: {e}")
+        try:
+            await websocket.close(code=1011)
+        except Exception:
+            pass
+    finally:
+        if writer:
+            writer.cancel()
+        feed.spectators.discard(connection)
+        connection_registry.remove(connection)
+        if not feed.spectators and spectator_feeds.get(lobby_id) is feed:
+            del spectator_feeds[lobby_id]
 
 @app.websocket("/ws/{lobby_id}")
 async def websocket_endpoint(websocket: WebSocket, lobby_id: str):
     await websocket.accept()
     
-    if lobby_id not in active_connections:
-        active_connections[lobby_id] = []
-    
-    active_connections[lobby_id].append(websocket)
-    print(f"WebSocket connected to lobby {lobby_id}. Total connections: {len(active_connections[lobby_id])}")
-    
-    # Track which player this connection belongs to
-    current_player_id = None
+    # The registry tracks which lobby and player this connection belongs to
+    connection = connection_registry.add(websocket, lobby_id)
+    print(f"WebSocket connected to lobby {lobby_id}. Total connections: {connection_registry.lobby_count(lobby_id)}")
     
     try:
         while True:
             data = await websocket.receive_text()
+            connection.last_seen = clock.monotonic()
             message = json.loads(data)
             print(f"Received message in lobby {lobby_id}: {message}")
             
@@ -955,7 +2196,7 @@ async def websocket_endpoint(websocket: WebSocket, lobby_id: str):
                             "player_id": player.id,
                             "player_name": player.name,
                             "message": message.get("message", ""),
-                            "timestamp": datetime.now().isoformat()
+                            "timestamp": clock.now().isoformat()
                         }
                         print(f"Broadcasting chat message: {chat_message}")
                         # Broadcast to all players including sender
@@ -963,12 +2204,22 @@ async def websocket_endpoint(websocket: WebSocket, lobby_id: str):
             
             elif message.get("type") == "ping":
                 await websocket.send_text(json.dumps({"type": "pong"}))
+            
+            elif message.get("type") == "pong":
+                # Reply to a server liveness ping; last_seen is already refreshed above
+                pass
                 
             elif message.get("type") == "player_connect":
                 # Player is connecting and identifying themselves
                 current_player_id = message.get("player_id")
-                if current_player_id:
-                    player_connections[current_player_id] = websocket
+                lobby = lobbies.get(lobby_id)
+                if not current_player_id or lobby is None or not any(p.id == current_player_id for p in lobby.players):
+                    print(f"Ignoring player_connect for unknown player {current_player_id} in lobby {lobby_id}")
+                elif connection.player_id != current_player_id:
+                    # A reconnect supersedes the player's previous socket in this lobby, reap it right away
+                    previous = connection_registry.bind_player(connection, current_player_id)
+                    if previous is not None:
+                        await reap_connection(previous, f"superseded by reconnect of player {current_player_id}", code=WS_CLOSE_SUPERSEDED)
                     print(f"Player {current_player_id} connected to lobby {lobby_id}")
             
             elif message.get("type") == "player_leave":
@@ -983,21 +2234,17 @@ async def websocket_endpoint(websocket: WebSocket, lobby_id: str):
                         # Remove player from lobby
                         lobby.players = [p for p in lobby.players if p.id != player_id]
                         update_lobby_activity(lobby_id)
+                        game_event_log.log("leave", lobby_id, {"player_id": player_id})
                         
                         # Clean up tracking
-                        if player_id in player_connections:
-                            del player_connections[player_id]
+                        connection_registry.unbind_player(player_id)
                         
                         # Only delete lobby if no players left AND no active connections
-                        if not lobby.players and (lobby_id not in active_connections or not active_connections[lobby_id]):
+                        if not lobby.players and not connection_registry.lobby_count(lobby_id):
                             print(f"Deleting empty lobby {lobby_id} (no players and no active connections)")
-                            del lobbies[lobby_id]
-                            if lobby_id in active_connections:
-                                del active_connections[lobby_id]
-                            if lobby_id in game_states:
-                                del game_states[lobby_id]
-                        elif not lobby.players and lobby_id in active_connections and active_connections[lobby_id]:
-                            print(f"Lobby {lobby_id} has no players but still has {len(active_connections[lobby_id])} active connections. Keeping lobby alive.")
+                            await delete_lobby(lobby_id)
+                        elif not lobby.players:
+                            print(f"Lobby {lobby_id} has no players but still has {connection_registry.lobby_count(lobby_id)} active connections. Keeping lobby alive.")
                         else:
                             # If host left, assign new host
                             if lobby.host_id == player_id and lobby.players:
@@ -1025,25 +2272,24 @@ async def websocket_endpoint(websocket: WebSocket, lobby_id: str):
                 
     except WebSocketDisconnect:
         print(f"WebSocket disconnected from lobby {lobby_id}")
-        if lobby_id in active_connections:
-            try:
-                if websocket in active_connections[lobby_id]:
-                    active_connections[lobby_id].remove(websocket)
-                    print(f"Removed connection from lobby {lobby_id}. Remaining connections: {len(active_connections[lobby_id])}")
-                    
-                    # If we know which player this was, remove them from tracking
-                    if current_player_id:
-                        if current_player_id in player_connections:
-                            del player_connections[current_player_id]
-                        print(f"Player {current_player_id} disconnected from lobby {lobby_id}")
-                    
-                    # If this was the last connection and there are players in the lobby,
-                    # we should clean up the lobby after a delay to allow reconnection
-                    if not active_connections[lobby_id] and lobby_id in lobbies:
-                        lobby = lobbies[lobby_id]
-                        if lobby.players:
-                            print(f"All connections lost for lobby {lobby_id}, but players still exist. Keeping lobby alive for potential reconnection.")
-            except ValueError:
-                # Connection already removed
-                print(f"Connection already removed from lobby {lobby_id}")
-                pass 
\ No newline at end of file
+    except Exception as e:
+        # Malformed frames or handler errors end the connection, the finally block still cleans up
+        print(f"WebSocket error in lobby {lobby_id}: {e}")
+        try:
+            await websocket.close(code=1011)
+        except Exception:
+            pass
+    finally:
+        player_id = connection.player_id
+        if connection_registry.remove(connection):
+            print(f"Removed connection from lobby {lobby_id}. Remaining connections: {connection_registry.lobby_count(lobby_id)}")
+            if player_id:
+                print(f"Player {player_id} disconnected from lobby {lobby_id}")
+            
+            # If this was the last connection and there are players in the lobby,
+            # we should clean up the lobby after a delay to allow reconnection
+            if not connection_registry.lobby_count(lobby_id) and lobby_id in lobbies and lobbies[lobby_id].players:
+                print(f"All connections lost for lobby {lobby_id}, but players still exist. Keeping lobby alive for potential reconnection.")
+        else:
+            # Connection already removed (failed broadcast or liveness reaper)
+            print(f"Connection already removed from lobby {lobby_id}")
@@ -0,0 +1,422 @@
+# Motord soak test
+#
+# Runs hours of lobby churn against the real handlers, in-process and in compressed time.
+# Simulated clients create and join lobbies, play games over the HTTP handlers and the
+# WebSocket endpoint, then leave over HTTP or over the socket, drop their sockets mid-game,
+# go silent, or simply walk away. Matchmaking tickets are queued, cancelled and left to
+# expire, and spectators come and go. The cleanup, matchmaking and liveness sweeps run on
+# their normal schedules against a manual clock that stands in for main.clock.
+#
+# After a warm-up the in-memory maps and the traced Python heap are sampled at a fixed
+# simulated interval. The run fails (exit status 1) if any map or the heap is still growing
+# by the end, and prints the allocation sites that grew the most.
+#
+# Usage (from backend/, so the wordlists are found):
+#   python soak.py                                  # 6 simulated hours
+#   python soak.py --hours 24 --lobbies-per-minute 20 --seed 7
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+# Keep the run's event log, leaderboard and word statistics away from the real ones
+SOAK_DIR = tempfile.mkdtemp(prefix="motord-soak-")
+os.environ["MOTORD_GAME_LOG"] = os.path.join(SOAK_DIR, "game_events.log")
+os.environ["MOTORD_LEADERBOARD_DB"] = os.path.join(SOAK_DIR, "leaderboard.db")
+os.environ["MOTORD_WORD_STATS"] = os.path.join(SOAK_DIR, "word_stats.json")
+
+from fastapi import HTTPException, WebSocketDisconnect
+
+import main
+
+class ManualClock(main.Clock):
+    """Clock that only moves when the soak loop advances it"""
+
+    def __init__(self):
+        self.start = datetime.now()
+        self.elapsed = 0.0
+
+    def now(self) -> datetime:
+        return self.start + timedelta(seconds=self.elapsed)
+
+    def monotonic(self) -> float:
+        return self.elapsed
+
+    def advance(self, seconds: float):
+        self.elapsed += seconds
+
+class SoakWebSocket:
+    """Stands in for a Starlette WebSocket. Frames from the client come off a queue, frames to it are dropped."""
+
+    def __init__(self, answers_pings: bool = True):
+        self.incoming: asyncio.Queue = asyncio.Queue()
+        self.answers_pings = answers_pings
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def receive_text(self) -> str:
+        frame = await self.incoming.get()
+        if frame is None:
+            raise WebSocketDisconnect(code=1000)
+        return frame
+
+    async def send_text(self, text: str):
+        if self.closed:
+            raise RuntimeError("WebSocket is closed")
+        if self.answers_pings and text == '{"type": "ping"}':
+            self.send_frame({"type": "pong"})
+
+    async def close(self, code: int = 1000):
+        if not self.closed:
+            self.closed = True
+            self.incoming.put_nowait(None)
+
+    def send_frame(self, message: Dict):
+        if not self.closed:
+            self.incoming.put_nowait(json.dumps(message))
+
+    def send_raw(self, frame: str):
+        if not self.closed:
+            self.incoming.put_nowait(frame)
+
+    def disconnect(self):
+        """Client side close"""
+        if not self.closed:
+            self.closed = True
+            self.incoming.put_nowait(None)
+
+class SimPlayer:
+    def __init__(self, player_id: str, language: str, socket: Optional[SoakWebSocket]):
+        self.id = player_id
+        self.language = language
+        self.socket = socket
+
+# How a simulated lobby ends, and how often
+FATES = {
+    "leave_http": 4,  # Everyone leaves through the leave endpoint after the game
+    "leave_ws": 4,  # Everyone sends player_leave over the socket after the game
+    "close_tabs": 3,  # Sockets close after the game without leaving
+    "drop_mid_game": 2,  # Sockets close while the game is running
+    "go_silent": 2,  # Sockets stay open but stop answering, the liveness reaper has to notice
+    "idle": 2,  # Sockets stay healthy but nobody plays, the still_playing prompt goes unanswered
+    "malformed": 1,  # A client sends a frame that is not JSON mid-game
+}
+
+class SimLobby:
+    def __init__(self, lobby_id: str, players: List[SimPlayer], fate: str):
+        self.id = lobby_id
+        self.players = players
+        self.fate = fate
+        self.stage = "waiting"  # waiting, playing, finished, gone
+        self.spectator: Optional[SoakWebSocket] = None
+        self.answered_still_playing = False
+
+class Soak:
+    def __init__(self, args, rng: random.Random, clock: ManualClock):
+        self.args = args
+        self.rng = rng
+        self.clock = clock
+        self.sims: List[SimLobby] = []
+        self.tickets: List[str] = []
+        self.tasks: set = set()
+        self.names = 0
+
+    def spawn(self, coroutine):
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def settle(self):
+        """Let the endpoint tasks drain the frames queued so far"""
+        for _ in range(4):
+            await asyncio.sleep(0)
+
+    def admitted(self, path: str) -> bool:
+        return main.admission_controller.check(path, "soak") is None
+
+    def connect(self, lobby_id: str, player_id: str) -> SoakWebSocket:
+        socket = SoakWebSocket(answers_pings=True)
+        self.spawn(main.websocket_endpoint(socket, lobby_id))
+        socket.send_frame({"type": "player_connect", "player_id": player_id})
+        return socket
+
+    def next_name(self) -> str:
+        self.names += 1
+        return f"soak{self.names}"
+
+    async def create_lobby(self):
+        language = self.rng.choice(["sv", "fr"])
+        created = await main.create_lobby(player_name=self.next_name(), language=language)
+        lobby_id = created["lobby_id"]
+        players = [SimPlayer(created["player_id"], language, None)]
+        for _ in range(self.rng.randint(1, 3)):
+            language = self.rng.choice(["sv", "fr"])
+            joined = await main.join_lobby(lobby_id, player_name=self.next_name(), language=language)
+            players.append(SimPlayer(joined["player_id"], language, None))
+        for player in players:
+            if self.rng.random() < 0.9:
+                player.socket = self.connect(lobby_id, player.id)
+        fate = self.rng.choices(list(FATES), weights=list(FATES.values()))[0]
+        self.sims.append(SimLobby(lobby_id, players, fate))
+
+    async def step_lobby(self, sim: SimLobby):
+        if sim.id not in main.lobbies:
+            self.forget(sim)
+            return
+        if sim.spectator is None and self.rng.random() < 0.02:
+            sim.spectator = SoakWebSocket()
+            self.spawn(main.spectator_endpoint(sim.spectator, sim.id))
+        elif sim.spectator is not None and self.rng.random() < 0.05:
+            sim.spectator.disconnect()
+            sim.spectator = None
+
+        if sim.fate == "idle":
+            # Healthy sockets, no play; answer the first still_playing prompt, ignore the second
+            if sim.id in main.still_playing_pending and not sim.answered_still_playing:
+                sim.answered_still_playing = True
+                connected = [p for p in sim.players if p.socket]
+                if connected:
+                    connected[0].socket.send_frame({"type": "still_playing_response"})
+            return
+
+        if sim.stage == "waiting":
+            for player in sim.players[1:]:
+                if self.admitted(f"/lobby/{sim.id}/player/{player.id}/ready"):
+                    await main.toggle_player_ready(sim.id, player.id)
+            lobby = main.lobbies[sim.id]
+            if all(p.ready for p in lobby.players):
+                await main.start_game(sim.id, player_id=sim.players[0].id)
+                sim.stage = "playing"
+        elif sim.stage == "playing":
+            await self.play_round(sim)
+        elif sim.stage == "finished":
+            await self.finish(sim)
+
+    async def play_round(self, sim: SimLobby):
+        if sim.fate == "drop_mid_game" and self.rng.random() < 0.2:
+            for player in sim.players:
+                if player.socket:
+                    player.socket.disconnect()
+            self.forget(sim)
+            return
+        if sim.fate == "go_silent" and self.rng.random() < 0.2:
+            for player in sim.players:
+                if player.socket:
+                    player.socket.answers_pings = False
+            self.forget(sim)
+            return
+        if sim.fate == "malformed" and self.rng.random() < 0.2:
+            connected = [p for p in sim.players if p.socket]
+            if connected:
+                self.rng.choice(connected).socket.send_raw("{not json")
+            sim.fate = "close_tabs"
+
+        game_state = main.game_states[sim.id]
+        roll = self.rng.random()
+        if roll < 0.15:
+            if self.admitted(f"/lobby/{sim.id}/timeout"):
+                await main.handle_timeout(sim.id)
+            return
+        player = self.rng.choice(sim.players)
+        if not self.admitted(f"/lobby/{sim.id}/player/{player.id}/translate"):
+            return
+        target_language = "fr" if player.language == "sv" else "sv"
+        guess = game_state.current_word_translations.get(target_language, "") if roll < 0.8 else "fel"
+        result = await main.check_translation(sim.id, player.id, translation=guess or "fel")
+        if result.get("game_ended"):
+            sim.stage = "finished"
+
+    async def finish(self, sim: SimLobby):
+        for player in sim.players:
+            if sim.fate == "leave_http":
+                await main.leave_lobby(sim.id, player.id)
+                if player.socket:
+                    player.socket.disconnect()
+            elif sim.fate == "leave_ws" and player.socket:
+                player.socket.send_frame({"type": "player_leave", "player_id": player.id})
+                player.socket.disconnect()
+            elif player.socket:
+                player.socket.disconnect()
+            if sim.id not in main.lobbies:
+                break
+        self.forget(sim)
+
+    def forget(self, sim: SimLobby):
+        """Stop driving a lobby. Responsive clients navigate away; silent ones are left to the liveness reaper."""
+        for player in sim.players:
+            if player.socket and player.socket.answers_pings:
+                player.socket.disconnect()
+        if sim.spectator is not None:
+            sim.spectator.disconnect()
+        sim.stage = "gone"
+
+    async def step_matchmaking(self):
+        if self.rng.random() < 0.3:
+            queued = await main.queue_for_match(
+                player_name=self.next_name(),
+                language=self.rng.choice(["sv", "fr"]),
+                difficulty=self.rng.randint(0, 3)
+            )
+            self.tickets.append(queued["ticket_id"])
+        if self.tickets and self.rng.random() < 0.1:
+            ticket_id = self.tickets.pop(self.rng.randrange(len(self.tickets)))
+            try:
+                await main.cancel_match_ticket(ticket_id)
+            except HTTPException:
+                pass
+        # Tickets nobody cancels are matched or expire on their own
+        self.tickets = [ticket_id for ticket_id in self.tickets if ticket_id in main.matchmaking_tickets]
+
+    async def step(self, tick: float):
+        self.clock.advance(tick)
+        elapsed = self.clock.elapsed
+        for _ in range(self.rng_count(self.args.lobbies_per_minute * tick / 60)):
+            await self.create_lobby()
+        for sim in list(self.sims):
+            try:
+                await self.step_lobby(sim)
+            except HTTPException:
+                # The server removed the lobby or player under us, which is what it should do
+                self.forget(sim)
+        self.sims = [sim for sim in self.sims if sim.stage != "gone"]
+        await self.step_matchmaking()
+        await self.settle()
+
+        # Background sweeps, on the schedules the server's tasks use
+        await main.match_queued_players()
+        main.expire_match_tickets()
+        if self.crossed(elapsed, tick, main.LIVENESS_SWEEP_INTERVAL):
+            await main.check_connection_liveness()
+        if self.crossed(elapsed, tick, 60):
+            await main.cleanup_disconnected_players()
+        await self.settle()
+
+    def rng_count(self, expected: float) -> int:
+        count = int(expected)
+        return count + (1 if self.rng.random() < expected - count else 0)
+
+    @staticmethod
+    def crossed(elapsed: float, tick: float, interval: float) -> bool:
+        return int(elapsed // interval) != int((elapsed - tick) // interval)
+
+def state_sizes() -> Dict[str, int]:
+    registry = main.connection_registry
+    return {
+        "lobbies": len(main.lobbies),
+        "game_states": len(main.game_states),
+        "still_playing_pending": len(main.still_playing_pending),
+        "spectator_feeds": len(main.spectator_feeds),
+        "connections": len(registry.by_id),
+        "connection_lobbies": len(registry.by_lobby),
+        "connected_players": len(registry.by_player),
+        "matchmaking_tickets": len(main.matchmaking_tickets),
+        "matchmaking_queues": len(main.matchmaking_queues),
+        "matchmaking_open_lobbies": sum(len(open_lobbies) for open_lobbies in main.matchmaking_open_lobbies.values()),
+        "admission_buckets": len(main.admission_controller.buckets),
+    }
+
+def peaks(samples: List[float]) -> Tuple[float, float]:
+    """Peak of the first and of the second half of the samples. Churn makes sizes swing, a leak makes the peaks climb."""
+    half = max(1, len(samples) // 2)
+    return max(samples[:half]), max(samples[half:] or samples)
+
+async def run(args) -> bool:
+    rng = random.Random(args.seed)
+    random.seed(args.seed)  # Word decks draw from the global generator
+    clock = ManualClock()
+    main.clock = clock
+    main.admission_controller.clock = clock.monotonic
+    main.admission_controller.last_sweep = clock.monotonic()
+    main.game_event_log.start()
+    main.leaderboard.start()
+    # Word statistics are bounded by the vocabulary, not by churn; fill them up front so they do not read as growth
+    for word in main.get_wordlist().words_by_name:
+        main.get_word_stats(word)
+
+    soak = Soak(args, rng, clock)
+    total = args.hours * 3600
+    warmup = args.warmup_hours * 3600
+    size_samples: Dict[str, List[int]] = {name: [] for name in state_sizes()}
+    memory_samples: List[int] = []
+    first_snapshot = None
+    next_sample = warmup
+
+    print(f"Soaking for {args.hours}h simulated ({args.warmup_hours}h warm-up), {args.lobbies_per_minute} lobbies/minute, seed {args.seed}")
+    devnull = open(os.devnull, "w")
+    try:
+        while clock.elapsed < total:
+            with contextlib.redirect_stdout(devnull):
+                await soak.step(args.tick)
+            if clock.elapsed >= next_sample:
+                next_sample += args.sample_minutes * 60
+                sizes = state_sizes()
+                for name, size in sizes.items():
+                    size_samples[name].append(size)
+                memory_samples.append(tracemalloc.get_traced_memory()[0])
+                if first_snapshot is None:
+                    first_snapshot = tracemalloc.take_snapshot()
+                hours = clock.elapsed / 3600
+                print(f"{hours:6.2f}h  heap {memory_samples[-1] / 1024 / 1024:7.2f} MiB  " + "  ".join(f"{name}={size}" for name, size in sizes.items() if size))
+    finally:
+        with contextlib.redirect_stdout(devnull):
+            for task in list(soak.tasks):
+                task.cancel()
+            await asyncio.gather(*soak.tasks, return_exceptions=True)
+        devnull.close()
+        main.game_event_log.stop()
+        main.leaderboard.stop()
+
+    ok = True
+    for name, samples in size_samples.items():
+        early, late = peaks(samples)
+        # Small maps swing by a few entries; only peaks that climb beyond that count
+        if late > early * (1 + args.tolerance) + args.size_slack:
+            print(f"FAIL {name} keeps growing: peak {early} -> {late}")
+            ok = False
+    early, late = peaks(memory_samples)
+    if late > early * (1 + args.tolerance) + args.memory_slack * 1024 * 1024:
+        print(f"FAIL heap keeps growing: peak {early / 1024 / 1024:.2f} -> {late / 1024 / 1024:.2f} MiB")
+        ok = False
+    if not ok or args.verbose:
+        print("Largest allocation growth since the end of the warm-up:")
+        for stat in tracemalloc.take_snapshot().compare_to(first_snapshot, "lineno")[:10]:
+            print(f"  {stat}")
+    print("PASS" if ok else "FAIL")
+    return ok
+
+def main_cli(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Soak the Motord backend with simulated lobby churn and check for memory growth")
+    parser.add_argument("--hours", type=float, default=6.0, help="Simulated hours to run")
+    parser.add_argument("--warmup-hours", type=float, default=1.0, help="Simulated hours before sampling starts")
+    parser.add_argument("--lobbies-per-minute", type=float, default=10.0, help="New lobbies per simulated minute")
+    parser.add_argument("--tick", type=float, default=5.0, help="Simulated seconds per step")
+    parser.add_argument("--sample-minutes", type=float, default=15.0, help="Simulated minutes between samples")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed growth of the second half's peak over the first half's")
+    parser.add_argument("--size-slack", type=int, default=20, help="Entries a map may grow by regardless of ratio")
+    parser.add_argument("--memory-slack", type=float, default=1.0, help="MiB the heap may grow by regardless of ratio")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="Always print the allocation growth")
+    args = parser.parse_args(argv)
+    if args.warmup_hours >= args.hours:
+        parser.error("--warmup-hours must be shorter than --hours")
+
+    tracemalloc.start()
+    try:
+        ok = asyncio.run(run(args))
+    finally:
+        shutil.rmtree(SOAK_DIR, ignore_errors=True)
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main_cli()
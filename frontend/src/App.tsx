@@ -7,6 +7,9 @@ import { MobileLobbyScreen } from './components/MobileLobbyScreen';
 import { MobileSetupScreen } from './components/MobileSetupScreen';
 import { MobileGameSummary } from './components/MobileGameSummary';
 
+// Close code the server uses when the same player connects from another socket
+const WS_CLOSE_SUPERSEDED = 4000
+
 interface Player {
   id: string
   name: string
@@ -18,6 +21,7 @@ interface Player {
   streak?: number
   highest_streak?: number
   fastest_guess?: number
+  claimed?: boolean  // false for a classroom seat nobody has joined yet
 }
 
 interface Lobby {
@@ -361,23 +365,31 @@ function App() {
 
   // WebSocket connection
   useEffect(() => {
+    let connectTimeout: NodeJS.Timeout | null = null
     if (lobbyId && playerId) {
       // Close existing connection if any
       if (wsRef.current) {
-        wsRef.current.close()
+        const ws = wsRef.current
+        wsRef.current = null
+        ws.close()
       }
       // Clear any pending reconnect
       if (reconnectTimeoutRef.current) {
         clearTimeout(reconnectTimeoutRef.current)
       }
       // Small delay to ensure clean connection
-      setTimeout(() => {
+      connectTimeout = setTimeout(() => {
         connectWebSocket()
       }, 100)
     }
     return () => {
+      if (connectTimeout) {
+        clearTimeout(connectTimeout)
+      }
       if (wsRef.current) {
-        wsRef.current.close()
+        const ws = wsRef.current
+        wsRef.current = null
+        ws.close()
       }
       if (reconnectTimeoutRef.current) {
         clearTimeout(reconnectTimeoutRef.current)
@@ -739,8 +751,17 @@ function App() {
       }
     }
 
-    ws.onclose = () => {
-      console.log('WebSocket disconnected')
+    ws.onclose = (event) => {
+      console.log('WebSocket disconnected', event.code)
+      // A socket that has been replaced, or that the server closed because this player
+      // connected again elsewhere, must not reconnect or the two keep superseding each other
+      if (wsRef.current !== ws) {
+        return
+      }
+      if (event.code === WS_CLOSE_SUPERSEDED) {
+        wsRef.current = null
+        return
+      }
       // Show connection lost popup
       setShowConnectionLostPopup(true)
       // Clear any existing reconnect timeout
@@ -835,6 +856,10 @@ function App() {
         })
         console.log('=== PLAYER JOINED HANDLER END ===')
         break
+      case 'lobby_roster':
+        // Whole roster at once, broadcast when a student claims a classroom seat
+        setLobby(prevLobby => prevLobby ? { ...prevLobby, host_id: data.host_id, players: data.players } : prevLobby)
+        break
       case 'player_ready_changed':
         console.log('=== PLAYER READY CHANGED HANDLER START ===')
         console.log('Received ready change data:', data)
@@ -1123,6 +1148,12 @@ function App() {
       case 'pong':
         console.log('Received pong from server')
         break
+      case 'ping':
+        // Server liveness check, answer so the connection is not reaped
+        if (wsRef.current && wsRef.current.readyState === WebSocket.OPEN) {
+          wsRef.current.send(JSON.stringify({ type: 'pong' }))
+        }
+        break
       case 'play_again':
         setLobby(prevLobby => prevLobby ? { ...prevLobby, players: data.players } : prevLobby)
         setGameSummary(null)
@@ -1203,7 +1234,8 @@ function App() {
         const data = await response.json()
         setPlayerId(data.player_id)
         setLobby(data.lobby)
-        setIsHost(false)
+        // A claimed classroom seat can be the host's
+        setIsHost(data.lobby.host_id === data.player_id)
         setSelectedDifficulty(data.lobby.difficulty)
         setSelectedMaxWords(data.lobby.max_words || 10)
         setCurrentPage('lobby')
@@ -2036,9 +2068,9 @@ function App() {
             <div className="flex gap-4 mb-2">
               <button
                 onClick={startGame}
-                disabled={!lobby?.players.every(p => p.ready)}
+                disabled={!lobby?.players.every(p => p.ready || p.claimed === false)}
                 className={`flex-1 h-12 py-3 rounded-lg font-semibold text-lg transition-all duration-150 focus:outline-none focus:ring-2 focus:ring-amber-500 shadow-md ${
-                  lobby?.players.every(p => p.ready)
+                  lobby?.players.every(p => p.ready || p.claimed === false)
                     ? 'bg-amber-500 text-white hover:bg-amber-600'
                     : 'bg-gray-600 text-gray-300 cursor-not-allowed'
                 }`}
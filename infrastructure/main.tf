@@ -105,9 +105,14 @@ resource "scaleway_instance_server" "app" {
             - "8000:8000"
           environment:
             - ENVIRONMENT=production
+            - MOTORD_LEADERBOARD_DB=/var/lib/motord/leaderboard.db
+            - MOTORD_GAME_LOG=/var/lib/motord/game_events.log
+            - MOTORD_WORD_STATS=/var/lib/motord/word_stats.json
           restart: unless-stopped
           networks:
             - motord-network
+          volumes:
+            - motord-data:/var/lib/motord
       
         frontend:
           image: ${scaleway_registry_namespace.main.endpoint}/${var.project_name}/frontend:latest
@@ -121,6 +126,9 @@ resource "scaleway_instance_server" "app" {
           volumes:
             - ./nginx.conf:/etc/nginx/nginx.conf:ro
       
+      volumes:
+        motord-data:
+      
       networks:
         motord-network:
           driver: bridge